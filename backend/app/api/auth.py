@@ -5,13 +5,14 @@ from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel, EmailStr
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from passlib.context import CryptContext
 
-from ..core.database import get_db, engine
-from ..models.models import Base, User
-from sqlalchemy import select, func, text
+from ..core.database import get_async_db
+from ..models.models import Base
+from sqlalchemy import func, text
 from ..services.email_service import send_verification_email, is_email_configured
+from ..services.wallet_users import wallet_users
 
 
 router = APIRouter(prefix="/auth", tags=["auth"])
@@ -68,22 +69,12 @@ def save_wallet(_: WalletRequest):
 
 
 @router.post("/wallet-login")
-def wallet_login(req: WalletLoginRequest, db: Session = Depends(get_db)):
+async def wallet_login(req: WalletLoginRequest, db: AsyncSession = Depends(get_async_db)):
     """Create or fetch a minimal user by wallet address and return user_id.
 
     This supports wallet-only auth.
     """
-    normalized = req.address.strip().lower()
-    user = db.query(User).filter(User.wallet_address == normalized).first()
-    if user:
-        return {"user_id": str(user.user_id)}
-
-    # If no user exists, create a minimal record with just wallet_address
-    user = User(wallet_address=normalized)
-    db.add(user)
-    db.commit()
-    db.refresh(user)
-    return {"user_id": str(user.user_id)}
+    return {"user_id": await wallet_users.get_or_create(db, req.address)}
 
 
 # Tables are managed in Neon via migrations/sql; do not auto-create here
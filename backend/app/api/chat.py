@@ -1,24 +1,37 @@
 from __future__ import annotations
 
-import os
-from typing import Any, Dict, Literal, Optional
+import asyncio
+import re
+from difflib import SequenceMatcher
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Literal, Optional, Set, Tuple
 import logging
 import json 
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from sqlalchemy.orm import Session
-from sqlalchemy import text
-from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
 
-from ..services.opensea_client import OpenSeaClient
+from ..services.collection_contracts import chain_id_for, collection_contracts
+from ..services.internal_api import InternalApiClient
+from ..services.opensea_client import OpenSeaClient, find_collection_slug
 from ..services.intent_classifier import LLMIntentClassifier
 from ..services.query_rewriter import QueryRewriter
+from ..services.llm_cache import normalize_query
 from ..services.small_talk import SmallTalkResponder
 from ..services.stats_responder import StatsResponder
 from ..services.collections_responder import CollectionsResponder
-from ..core.database import get_db
-import aiohttp
-from ..models.models import ConversationMessage, User
+from ..services.llm import TokenCallback
+from ..core.config import settings
+from ..core.database import AsyncSessionLocal, get_async_db
+from .deps import get_internal_api, get_opensea_client
+from .pagination import clamp_limit, keyset_page, set_page_headers
+from ..models.models import Conversation, ConversationMessage
+from ..services.conversation_context import load_conversation_context
+from ..services.conversation_state import FlowState, conversation_states
+from ..services.message_writer import MessageWriteError, message_writer
+from ..services.submissions import idempotency_key, submissions
+from ..services.wallet_users import wallet_users
 
 
 router = APIRouter(prefix="/chat", tags=["chat"])
@@ -39,109 +52,165 @@ class ChatResponse(BaseModel):
     data: Optional[Dict[str, Any]] = None
 
 
+EventEmitter = Callable[[str, Dict[str, Any]], Awaitable[None]]
+
+
 @router.post("/message", response_model=ChatResponse)
-async def handle_message(req: ChatRequest, db: Session = Depends(get_db)) -> ChatResponse:
+async def handle_message(
+    req: ChatRequest,
+    db: AsyncSession = Depends(get_async_db),
+    opensea: OpenSeaClient = Depends(get_opensea_client),
+    internal_api: InternalApiClient = Depends(get_internal_api),
+) -> ChatResponse:
+    return await _run_turn(req, db, opensea, internal_api)
+
+
+@router.post("/message/stream")
+async def handle_message_stream(
+    req: ChatRequest,
+    opensea: OpenSeaClient = Depends(get_opensea_client),
+    internal_api: InternalApiClient = Depends(get_internal_api),
+) -> StreamingResponse:
+    """Server-sent events variant of /message.
+
+    Emits ``stage`` events (rewritten, intent), then ``token`` events with reply
+    deltas as the responder generates them, and finally one ``done`` event
+    carrying ``reply`` and ``data`` (the reply in ``done`` is authoritative).
+    Failures are reported as an ``error`` event.
+    """
+    queue: asyncio.Queue[tuple[str, Dict[str, Any]] | None] = asyncio.Queue()
+    streamed = False
+
+    async def emit(event: str, payload: Dict[str, Any]) -> None:
+        nonlocal streamed
+        if event == "token":
+            streamed = True
+        await queue.put((event, payload))
+
+    async def run() -> None:
+        # The session must outlive the request handler, so it is owned here
+        try:
+            async with AsyncSessionLocal() as db:
+                resp = await _run_turn(req, db, opensea, internal_api, emit=emit)
+            if not streamed and resp.reply:
+                # Non-LLM replies (flows, pool listings) arrive as a single token
+                await emit("token", {"text": resp.reply})
+            await queue.put(("done", resp.model_dump()))
+        except HTTPException as e:
+            await queue.put(("error", {"status": e.status_code, "detail": e.detail}))
+        except Exception as e:  # noqa: BLE001
+            logger.exception("[Chat] Streaming turn failed: %s", e)
+            await queue.put(("error", {"status": 500, "detail": "Internal error"}))
+        finally:
+            await queue.put(None)
+
+    async def events() -> AsyncIterator[str]:
+        task = asyncio.create_task(run())
+        try:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    break
+                event, payload = item
+                yield f"event: {event}\ndata: {json.dumps(payload, default=str)}\n\n"
+        finally:
+            if not task.done():
+                # Client went away; stop generating
+                task.cancel()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _run_turn(
+    req: ChatRequest,
+    db: AsyncSession,
+    opensea: OpenSeaClient,
+    internal_api: InternalApiClient,
+    emit: EventEmitter | None = None,
+) -> ChatResponse:
+    on_token: TokenCallback | None = None
+    if emit is not None:
+        async def forward_token(delta: str) -> None:
+            await emit("token", {"text": delta})
+
+        on_token = forward_token
+
     # Resolve effective user id from wallet if needed
     effective_user_id: Optional[str] = req.user_id
     if not effective_user_id and req.wallet_address:
-        effective_user_id = _get_or_create_user_id_by_wallet(db, req.wallet_address)
-    # Fetch short conversation history
-    history_pairs: list[str] = []
-    if req.conversation_id:
-        stmt = select(ConversationMessage).where(ConversationMessage.conversation_id == req.conversation_id)
-        if effective_user_id:
-            stmt = stmt.where(ConversationMessage.user_id == effective_user_id)
-        stmt = stmt.order_by(ConversationMessage.created_at.asc()).limit(20)
-        rows = db.execute(stmt).scalars().all()
-        for r in rows:
-            if r.ai_answer:
-                history_pairs.append(f"User: {r.user_question}\nAssistant: {r.ai_answer}")
-
-    # Rewrite user message with context
-    rewriter = QueryRewriter()
-    rewritten = await rewriter.rewrite(req.message, history_pairs)
-    logger.info("[Chat] Original: %r | Rewritten: %r", req.message, rewritten)
-
-    # Check if we're already in a specific flow by looking at recent conversation history
+        effective_user_id = await wallet_users.get_or_create(db, req.wallet_address)
+    # Load the latest turns and the last intent once; every flow below reuses them
+    ctx = await load_conversation_context(db, req.conversation_id, effective_user_id)
+    history_pairs = ctx.history_pairs
+
+    # Check if we're already in a specific flow. Structured flows come from the
+    # persisted flow state; the others from the last intent / last assistant reply.
+    flow_state = await conversation_states.get(db, req.conversation_id, effective_user_id)
+    if flow_state.flow is None and flow_state.flow_id:
+        # The previous turn submitted a pool create / investment. A client retrying
+        # that turn gets the submission's result; any other message moves on.
+        replayed = await submissions.replay(req.conversation_id, flow_state.flow_id, req.message)
+        if replayed is not None:
+            logger.info("[Chat] Replaying submission result for conversation %s", req.conversation_id)
+            return replayed[0]
+        flow_state.reset()
+        await conversation_states.save(db, flow_state)
     in_create_pool_flow = False
     in_nft_statistics_flow = False
     in_pool_invest_flow = False
     in_retrieve_pools_flow = False
-    last_intent = None
+    # Flow stickiness by last intent only applies to identified users
+    last_intent = ctx.last_intent if effective_user_id else None
     
     if req.conversation_id:
-        # Get the last intent from the database
-        if effective_user_id:
-            last_msg_query = text("""
-                SELECT intent FROM conversation_messages 
-                WHERE conversation_id = :conv_id AND user_id = :user_id 
-                AND intent IS NOT NULL
-                ORDER BY created_at DESC LIMIT 1
-            """)
-            result = db.execute(last_msg_query, {
-                "conv_id": req.conversation_id, 
-                "user_id": effective_user_id
-            }).fetchone()
-            if result:
-                last_intent = result[0]
+        last_reply = ctx.last_assistant or ""
+        nft_statistics_keywords = [
+            "please provide the opensea collection link or slug",
+            "please provide a collection slug or link"
+        ]
         
-        # Check assistant message keywords as backup
-        if history_pairs:
-            last_pair = history_pairs[-1] if history_pairs else ""
-            if "Assistant:" in last_pair:
-                last_reply = last_pair.split("Assistant:", 1)[1].strip().lower()
-                create_pool_keywords = [
-                    "what name do we give to the pool",
-                    "opensea collection link",
-                    "creator fee",
-                    "buying price", "set a buying price",
-                    "selling price", "set a selling price"
-                ]
-                nft_statistics_keywords = [
-                    "please provide the opensea collection link or slug",
-                    "please provide a collection slug or link"
-                ]
-                
-                # Check if user is explicitly requesting a different action
-                user_msg_lower = req.message.lower()
-                explicit_create_pool = any(phrase in user_msg_lower for phrase in [
-                    "create a pool", "create pool", "make a pool", "new pool", "start pool creation"
-                ])
-                explicit_pool_invest = (("invest" in user_msg_lower or "deposit" in user_msg_lower or "fund" in user_msg_lower) and "pool" in user_msg_lower)
-                explicit_nft_stats = any(phrase in user_msg_lower for phrase in [
-                    "floor price", "statistics", "stats", "market cap", "volume", "price data"
-                ])
-                
-                # If user explicitly requests different intent, allow intent switching
-                if explicit_pool_invest:
-                    logger.info("[Chat] User explicitly requested pool_invest, switching from %r", last_intent)
-                    in_pool_invest_flow = True
-                    in_create_pool_flow = False
-                    in_nft_statistics_flow = False
-                elif explicit_create_pool and last_intent != "create_pool":
-                    logger.info("[Chat] User explicitly requested create_pool, switching from %r", last_intent)
-                    # Don't force flow continuation, let classifier decide
-                elif explicit_nft_stats and last_intent != "nft_statistics":
-                    logger.info("[Chat] User explicitly requested nft_statistics, switching from %r", last_intent)
-                    # Don't force flow continuation, let classifier decide
-                # Primary check: use last intent if available and no explicit switch
-                elif last_intent == "retrieve_pools" and not explicit_pool_invest and not explicit_create_pool:
-                    # When last intent is retrieve_pools, we stay in that flow and do NOT
-                    # fall into create_pool unless the user explicitly asks to create a pool.
-                    in_retrieve_pools_flow = True
-                elif last_intent == "pool_invest" and not explicit_create_pool and not explicit_nft_stats:
-                    in_pool_invest_flow = True
-                elif last_intent == "create_pool" and not explicit_nft_stats:
-                    in_create_pool_flow = True
-                elif last_intent == "nft_statistics" and not explicit_create_pool:
-                    in_nft_statistics_flow = True
-                # Fallback: check keywords in assistant message
-                elif any(keyword in last_reply for keyword in create_pool_keywords):
-                    in_create_pool_flow = True
-                elif any(keyword in last_reply for keyword in nft_statistics_keywords):
-                    in_nft_statistics_flow = True
+        # Check if user is explicitly requesting a different action
+        user_msg_lower = req.message.lower()
+        explicit_create_pool = any(phrase in user_msg_lower for phrase in [
+            "create a pool", "create pool", "make a pool", "new pool", "start pool creation"
+        ])
+        explicit_pool_invest = (("invest" in user_msg_lower or "deposit" in user_msg_lower or "fund" in user_msg_lower) and "pool" in user_msg_lower)
+        explicit_nft_stats = any(phrase in user_msg_lower for phrase in [
+            "floor price", "statistics", "stats", "market cap", "volume", "price data"
+        ])
+        
+        # If user explicitly requests different intent, allow intent switching
+        if explicit_pool_invest:
+            logger.info("[Chat] User explicitly requested pool_invest, switching from %r", flow_state.flow or last_intent)
+            in_pool_invest_flow = True
+        elif explicit_create_pool and flow_state.flow != "create_pool":
+            logger.info("[Chat] User explicitly requested create_pool, switching from %r", flow_state.flow or last_intent)
+            # Don't force flow continuation, let classifier decide
+        elif explicit_nft_stats and last_intent != "nft_statistics":
+            logger.info("[Chat] User explicitly requested nft_statistics, switching from %r", flow_state.flow or last_intent)
+            # Don't force flow continuation, let classifier decide
+        # Primary check: an active structured flow, unless the user switched explicitly
+        elif flow_state.flow == "pool_invest" and not explicit_create_pool and not explicit_nft_stats:
+            in_pool_invest_flow = True
+        elif flow_state.flow == "create_pool" and not explicit_nft_stats:
+            in_create_pool_flow = True
+        elif history_pairs:
+            if last_intent == "retrieve_pools" and not explicit_pool_invest and not explicit_create_pool:
+                # When last intent is retrieve_pools, we stay in that flow and do NOT
+                # fall into create_pool unless the user explicitly asks to create a pool.
+                in_retrieve_pools_flow = True
+            elif last_intent == "nft_statistics" and not explicit_create_pool:
+                in_nft_statistics_flow = True
+            # Fallback: check keywords in assistant message
+            elif any(keyword in last_reply for keyword in nft_statistics_keywords):
+                in_nft_statistics_flow = True
 
     # Classify intent - stay in flow unless user cancels
+    intent: Optional[str] = None
     if in_pool_invest_flow and not any(w in req.message.lower() for w in ["cancel", "stop", "abort"]):
         intent = "pool_invest"
         logger.info("[Chat] Staying in pool_invest flow (last intent: %r)", last_intent)
@@ -154,298 +223,196 @@ async def handle_message(req: ChatRequest, db: Session = Depends(get_db)) -> Cha
     elif in_nft_statistics_flow and not any(w in req.message.lower() for w in ["cancel", "stop", "abort"]):
         intent = "nft_statistics"
         logger.info("[Chat] Staying in nft_statistics flow (last intent: %r)", last_intent)
+
+    classifier = LLMIntentClassifier()
+    if intent is not None and (in_retrieve_pools_flow or in_nft_statistics_flow):
+        # These flows are only inferred from the last intent, so a message the
+        # cheap classifier confidently places elsewhere is ambiguous: run the
+        # full pipeline for it instead of forcing the flow.
+        fast = classifier.classify_fast(req.message)
+        if fast is not None and fast[0] != intent:
+            logger.info("[Chat] Message looks like %r (%s), not continuing %s flow", fast[0], fast[1], intent)
+            intent = None
+
+    if intent is not None:
+        # Flow continuation (slot answers, links, amounts) is routed from state
+        # alone and the branches read the raw message, so no LLM call is made.
+        rewritten = req.message
+        # Stored without a rewrite: the intent comes from the flow, not the text,
+        # so the row must not be used as a training label
+        stored_rewrite: Optional[str] = None
+        logger.info("[Chat] Flow turn, skipping rewrite and classification")
+        if emit is not None:
+            await emit("stage", {"stage": "rewritten", "rewritten": rewritten})
     else:
-        classifier = LLMIntentClassifier()
-        intent = await classifier.classify(rewritten)
-        logger.info("[Chat] Intent: %r", intent)
+        # Rewrite user message with context. The raw message is classified
+        # concurrently (and likely OpenSea fetches started) so the classifier
+        # round trip overlaps the rewriter's.
+        rewriter = QueryRewriter()
+        speculative: asyncio.Task[Tuple[str, str]] | None = None
+        if settings.CHAT_SPECULATIVE_PIPELINE:
+            speculative = asyncio.ensure_future(_speculate_intent(classifier, req, opensea))
+        try:
+            rewritten = await rewriter.rewrite(req.message, history_pairs)
+            logger.info("[Chat] Original: %r | Rewritten: %r", req.message, rewritten)
+            stored_rewrite = rewritten
+            if emit is not None:
+                await emit("stage", {"stage": "rewritten", "rewritten": rewritten})
+
+            if speculative is not None:
+                intent = await _reconcile_intent(classifier, req.message, rewritten, speculative)
+            else:
+                intent = await classifier.classify(rewritten)
+            logger.info("[Chat] Intent: %r", intent)
+        finally:
+            if speculative is not None and not speculative.done():
+                speculative.cancel()
+    if flow_state.flow and intent != flow_state.flow:
+        # The user left the structured flow; drop its partial slots
+        logger.info("[Chat] Leaving %s flow for %r", flow_state.flow, intent)
+        flow_state.reset()
+        await conversation_states.save(db, flow_state)
+    if emit is not None:
+        await emit("stage", {"stage": "intent", "intent": intent})
 
     if intent == "small_talk":
         responder = SmallTalkResponder()
-        reply = await responder.respond(rewritten, history_pairs)
+        reply = await responder.respond(rewritten, history_pairs, on_token=on_token)
         logger.info("[Chat] SmallTalk reply: %r", reply)
-        _persist(db, req, rewritten, intent, reply, effective_user_id=effective_user_id)
+        await _persist(req, stored_rewrite, intent, reply, effective_user_id=effective_user_id)
         return ChatResponse(reply=reply)
     if intent == "create_pool":
         # Check for cancellation
         if any(w in req.message.lower() for w in ["cancel", "stop", "abort"]):
+            flow_state.reset()
+            await conversation_states.save(db, flow_state)
             reply_text = "Okay, I've cancelled the pool creation flow."
-            _persist(db, req, rewritten, intent, reply_text, effective_user_id=effective_user_id)
-            return ChatResponse(reply=reply_text)
-        
-        # Simple regex-based extraction for robustness
-        import re
-
-        def extract(pattern: str, text: str) -> str | None:
-            m = re.search(pattern, text, flags=re.I)
-            return m.group(1).strip() if m else None
-
-        def parse_number(text: str) -> str | None:
-            m = re.search(r"([0-9]+(?:[\.,][0-9]+)?)", text)
-            if not m:
-                return None
-            return m.group(1).replace(",", ".")
-
-        # Get conversation history for this conversation
-        history_pairs = []
-        if req.conversation_id:
-            history_msgs = db.execute(
-                text("SELECT user_question, ai_answer as assistant_reply FROM conversation_messages WHERE conversation_id = :conv_id ORDER BY created_at ASC"),
-                {"conv_id": req.conversation_id}
-            ).fetchall()
-            for msg in history_msgs:
-                if msg[0] and msg[1]:  # user_question and assistant_reply
-                    history_pairs.append(f"User: {msg[0]}\nAssistant: {msg[1]}")
-
-        transcript = "\n".join(history_pairs + [f"User: {req.message}"])
-        logger.info("[Chat] Full transcript: %r", transcript)
-        last_assistant = None
-        last_user_text = None
-        if history_pairs:
-            try:
-                last_pair = history_pairs[-1]
-                # Extract last user and assistant texts from the formatted pair
-                if "Assistant:" in last_pair and "User:" in last_pair:
-                    parts = last_pair.split("User:", 1)[1]  # Get everything after "User:"
-                    if "Assistant:" in parts:
-                        user_part = parts.split("Assistant:", 1)[0].strip()
-                        assistant_part = parts.split("Assistant:", 1)[1].strip()
-                        last_user_text = user_part
-                        last_assistant = assistant_part.lower()
-                    else:
-                        last_user_text = parts.strip()
-                elif "Assistant:" in last_pair:
-                    last_assistant = last_pair.split("Assistant:", 1)[1].strip().lower()
-            except Exception as e:
-                logger.warning("[Chat] Error parsing conversation history: %s", e)
-                last_assistant = None
-
-        # STRICT Q&A: Do not infer values opportunistically from arbitrary messages.
-        # Values are only captured as answers to our explicit questions in this flow.
-        pool_name = None
-        opensea_link = None
-        creator_fee = None
-        buy_price = None
-        sell_price = None
-        logger.info("[Chat] Initialized create_pool fields to None for strict Q&A mode")
-
-        # If user answered previously to a specific question, reconstruct values
-        logger.info("[Chat] last_assistant: %r, last_user_text: %r", last_assistant, last_user_text)
-        
-        # Also extract values by looking at each conversation turn in sequence
-        conversation_turns = []
-        for pair in history_pairs:
-            if "User:" in pair and "Assistant:" in pair:
-                parts = pair.split("User:", 1)[1]  # Get everything after "User:"
-                if "Assistant:" in parts:
-                    user_msg = parts.split("Assistant:", 1)[0].strip()
-                    assistant_msg = parts.split("Assistant:", 1)[1].strip()
-                    conversation_turns.append((user_msg, assistant_msg))
-        
-        # Extract values based on conversation context
-        logger.info("[Chat] Conversation turns: %r", conversation_turns)
-        for i, (user_msg, assistant_msg) in enumerate(conversation_turns):
-            assistant_lower = assistant_msg.lower()
-            if "what name do we give to the pool" in assistant_lower and not pool_name:
-                # The next user message (if exists) should be the pool name
-                if i + 1 < len(conversation_turns):
-                    pool_name = conversation_turns[i + 1][0].strip()
-                elif req.message.strip():  # Current message is the answer
-                    pool_name = req.message.strip()
-            elif "opensea collection link" in assistant_lower and not opensea_link:
-                # The next user message (if exists) should be the opensea link
-                if i + 1 < len(conversation_turns):
-                    opensea_link = extract(r"https?://opensea\.io/collection/([a-z0-9\-]+)", conversation_turns[i + 1][0])
-                elif req.message.strip():  # Current message is the answer
-                    opensea_link = extract(r"https?://opensea\.io/collection/([a-z0-9\-]+)", req.message)
-            elif "creator fee" in assistant_lower and not creator_fee:
-                if i + 1 < len(conversation_turns):
-                    creator_fee = parse_number(conversation_turns[i + 1][0])
-                elif req.message.strip():
-                    creator_fee = parse_number(req.message)
-            elif any(p in assistant_lower for p in ["buying price", "set a buying price"]) and not buy_price:
-                if i + 1 < len(conversation_turns):
-                    buy_price = parse_number(conversation_turns[i + 1][0])
-                elif req.message.strip():
-                    buy_price = parse_number(req.message)
-            elif any(p in assistant_lower for p in ["selling price", "set a selling price"]) and not sell_price:
-                if i + 1 < len(conversation_turns):
-                    sell_price = parse_number(conversation_turns[i + 1][0])
-                elif req.message.strip():
-                    sell_price = parse_number(req.message)
-        
-        # Legacy fallback logic
-        if last_assistant and last_user_text:
-            if "creator fee" in last_assistant and not creator_fee:
-                creator_fee = parse_number(last_user_text)
-            if any(p in last_assistant for p in ["buying price", "set a buying price"]) and not buy_price:
-                buy_price = parse_number(last_user_text)
-            if any(p in last_assistant for p in ["selling price", "set a selling price"]) and not sell_price:
-                sell_price = parse_number(last_user_text)
-            if "what name do we give to the pool" in last_assistant and not pool_name:
-                pool_name = last_user_text.strip()
-            if "opensea collection link" in last_assistant and not opensea_link:
-                opensea_link = extract(r"https?://opensea\.io/collection/([a-z0-9\-]+)", last_user_text)
-
-        # If user answered the current prompt, capture it
-        if not opensea_link and last_assistant and "opensea collection link" in last_assistant:
-            opensea_link = extract(r"https?://opensea\.io/collection/([a-z0-9\-]+)", req.message)
-        if not creator_fee and last_assistant and "creator fee" in last_assistant:
-            creator_fee = parse_number(req.message)
-        if not buy_price and last_assistant and any(p in last_assistant for p in ["buying price", "set a buying price"]):
-            buy_price = parse_number(req.message)
-        if not sell_price and last_assistant and any(p in last_assistant for p in ["selling price", "set a selling price"]):
-            sell_price = parse_number(req.message)
-            
-        logger.info("[Chat] Final extracted values - pool_name: %r, opensea_link: %r, creator_fee: %r, buy_price: %r, sell_price: %r", 
-                   pool_name, opensea_link, creator_fee, buy_price, sell_price)
-
-        # Ask the next missing item in strict order. If the last assistant advanced
-        # to a later stage, consider previous fields satisfied to avoid backtracking.
-        stage_hint = last_assistant or ""
-        advanced_to_buy = any(p in stage_hint for p in ["buying price", "set a buying price"])
-        advanced_to_sell = any(p in stage_hint for p in ["selling price", "set a selling price"])
-
-        if not pool_name:
-            reply_text = (
-                "Great! I will do some questions to characterize the pool. "
-                "First, what name do we give to the pool?"
-            )
-            _persist(db, req, rewritten, intent, reply_text, effective_user_id=effective_user_id)
-            return ChatResponse(reply=reply_text)
-        if not opensea_link:
-            reply_text = "Provide the OpenSea collection link (e.g., https://opensea.io/collection/pudgypenguins)."
-            _persist(db, req, rewritten, intent, reply_text, effective_user_id=effective_user_id)
-            return ChatResponse(reply=reply_text)
-        if not creator_fee and not advanced_to_buy and not advanced_to_sell:
-            reply_text = "What creator fee do you want to add to the pool? Give a percentage, e.g., 0.5"
-            _persist(db, req, rewritten, intent, reply_text, effective_user_id=effective_user_id)
-            return ChatResponse(reply=reply_text)
-        if not buy_price and not advanced_to_sell:
-            reply_text = "Set a buying price for the NFT (in ETH)."
-            _persist(db, req, rewritten, intent, reply_text, effective_user_id=effective_user_id)
-            return ChatResponse(reply=reply_text)
-        if not sell_price:
-            reply_text = "Set a selling price for the NFT (in ETH)."
-            _persist(db, req, rewritten, intent, reply_text, effective_user_id=effective_user_id)
+            await _persist(req, stored_rewrite, intent, reply_text, effective_user_id=effective_user_id)
             return ChatResponse(reply=reply_text)
 
-        # We have all inputs. Resolve collection details and chainId via OpenSea
-        client = OpenSeaClient()
-        data = await client.get_collection(opensea_link)
-        # The response shape can vary; sometimes top-level fields describe the
-        # collection, and there may also be a field named "collection" which is
-        # actually the slug string. Normalize robustly to a dict describing the collection.
-        coll = data
-        if isinstance(data, dict) and isinstance(data.get("collection"), dict):
-            coll = data["collection"]
-        # Extract NFT contract address from known fields
-        nft_address: str | None = None
-        if isinstance(coll, dict):
-            candidates = []
-            if isinstance(coll.get("primary_asset_contracts"), list):
-                candidates.extend(coll.get("primary_asset_contracts") or [])
-            if isinstance(coll.get("contracts"), list):
-                candidates.extend(coll.get("contracts") or [])
-            for c in candidates:
-                if isinstance(c, dict) and c.get("address"):
-                    nft_address = c["address"]
-                    chain_str = c.get("chain")
-                    break
-            # Fallbacks
-            chain_str = (
-                locals().get("chain_str")
-                or coll.get("chain")
-                or "shapeSepolia"
-            )
-        else:
-            nft_address = ""
-            chain_str = "shapeSepolia"
-
-        # Map chain string to numeric id used in FE API
-        chain_map = {"shape": 360, "shape-sepolia": 11011, "shapeSepolia": 11011}
-        chain_id = chain_map.get(str(chain_str), 11011)
-
-        # Build request payload for FE route
-        payload = {
-            "name": pool_name,
-            "nftCollectionAddress": nft_address or "",
-            "creatorFee": float(creator_fee or 0),
-            "buyPrice": float(buy_price or 0),
-            "sellPrice": float(sell_price or 0),
-            "chainId": chain_id,
-            "collection_slug": opensea_link.strip().split("/")[-1]
-        }
-        logger.info("[Chat] Pool creation payload: %r", payload)
-
-        # Attempt to create the pool by calling the Next.js API route
-        creation_ok = False
-        creation_err: str | None = None
-        pool_response: dict | None = None
-        try:
-            fe_base = os.getenv("FE_BASE_URL", "http://localhost:3002")
-            url = f"{fe_base}/api/pool/create"
-            headers = {
-                "Content-Type": "application/json",
-                "x-internal-call": "true"
-            }
-            
-            # Add wallet_address to the payload for server-to-server authentication
-            payload_with_auth = {**payload, "wallet_address": req.wallet_address}
-            
-            async with aiohttp.ClientSession() as session:
-                async with session.post(url, json=payload_with_auth, headers=headers) as resp:
-                    if resp.status == 200:
-                        creation_ok = True
-                        pool_response = await resp.json()
-                    else:
-                        creation_err = f"frontend returned {resp.status}: {await resp.text()}"
-        except Exception as e:  # noqa: BLE001
-            creation_err = str(e)
-
-        if creation_ok:
-            reply_text = "Pool created successfully!"
-            _persist(db, req, rewritten, intent, reply_text, data={"pool": pool_response}, effective_user_id=effective_user_id)
-            return ChatResponse(reply=reply_text, data={"pool": pool_response})
-        else:
-            # Fallback: return payload so FE can still trigger manually
-            reply_text = "Got it. Creating the pool with the provided details. The automatic creation failed; please try from the UI."
-            if creation_err:
-                reply_text += f" Error: {creation_err}"
-            _persist(db, req, rewritten, intent, reply_text, data=payload, effective_user_id=effective_user_id)
-            return ChatResponse(reply=reply_text, data=payload)
+        # STRICT Q&A: values are only captured as answers to our explicit questions,
+        # tracked by flow_state.awaiting instead of re-reading the transcript.
+        if flow_state.flow != "create_pool":
+            flow_state.start("create_pool")
+        slots = flow_state.slots
+        answer = req.message.strip()
+        if flow_state.awaiting == "pool_name" and answer:
+            slots["pool_name"] = answer
+        elif flow_state.awaiting == "collection_slug":
+            slots["collection_slug"] = find_collection_slug(answer) or slots.get("collection_slug")
+        elif flow_state.awaiting in ("creator_fee", "buy_price", "sell_price"):
+            slots[flow_state.awaiting] = _parse_number(answer) or slots.get(flow_state.awaiting)
+        logger.info("[Chat] create_pool slots: %r (answered %r)", slots, flow_state.awaiting)
+
+        # Ask the next missing item in strict order
+        prompts = [
+            ("pool_name", "Great! I will do some questions to characterize the pool. First, what name do we give to the pool?"),
+            ("collection_slug", "Provide the OpenSea collection link (e.g., https://opensea.io/collection/pudgypenguins)."),
+            ("creator_fee", "What creator fee do you want to add to the pool? Give a percentage, e.g., 0.5"),
+            ("buy_price", "Set a buying price for the NFT (in ETH)."),
+            ("sell_price", "Set a selling price for the NFT (in ETH)."),
+        ]
+        for slot, prompt in prompts:
+            if not slots.get(slot):
+                flow_state.awaiting = slot
+                await conversation_states.save(db, flow_state)
+                await _persist(req, stored_rewrite, intent, prompt, effective_user_id=effective_user_id)
+                return ChatResponse(reply=prompt)
+
+        pool_name = slots["pool_name"]
+        opensea_link = slots["collection_slug"]
+        creator_fee = slots["creator_fee"]
+        buy_price = slots["buy_price"]
+        sell_price = slots["sell_price"]
+        key = idempotency_key(req.conversation_id, req.wallet_address, "create_pool", flow_state.flow_id, slots)
+
+        async def submit_pool() -> Tuple[ChatResponse, bool]:
+            creation_ok = False
+            creation_err: str | None = None
+            pool_response: dict | None = None
+            payload: Dict[str, Any] | None = None
+            try:
+                # We have all inputs. Resolve the NFT contract and chainId (local index, then OpenSea).
+                # Runs shielded from this request (see submissions), so it owns its session.
+                async with AsyncSessionLocal() as submit_db:
+                    contract = await collection_contracts.resolve(submit_db, opensea, opensea_link)
+                nft_address = contract.address if contract else ""
+                chain_id = contract.chain_id if contract else chain_id_for(None)
+
+                # Build request payload for FE route
+                payload = {
+                    "name": pool_name,
+                    "nftCollectionAddress": nft_address or "",
+                    "creatorFee": float(creator_fee or 0),
+                    "buyPrice": float(buy_price or 0),
+                    "sellPrice": float(sell_price or 0),
+                    "chainId": chain_id,
+                    "collection_slug": opensea_link.strip().split("/")[-1]
+                }
+                logger.info("[Chat] Pool creation payload: %r", payload)
+
+                # Attempt to create the pool by calling the Next.js API route
+                # Add wallet_address to the payload for server-to-server authentication
+                payload_with_auth = {**payload, "wallet_address": req.wallet_address}
+                resp = await internal_api.create_pool(payload_with_auth, idempotency_key=key)
+                if resp.ok:
+                    creation_ok = True
+                    pool_response = resp.data
+                else:
+                    creation_err = f"frontend returned {resp.status}: {resp.text}"
+            except Exception as e:  # noqa: BLE001
+                creation_err = str(e)
+            await _close_submission(flow_state, creation_ok)
+
+            if creation_ok:
+                reply_text = "Pool created successfully!"
+                await _persist(req, stored_rewrite, intent, reply_text, data={"pool": pool_response}, effective_user_id=effective_user_id)
+                return ChatResponse(reply=reply_text, data={"pool": pool_response}), True
+            else:
+                # Fallback: return payload so FE can still trigger manually
+                reply_text = "Got it. Creating the pool with the provided details. The automatic creation failed; please try from the UI."
+                if creation_err:
+                    reply_text += f" Error: {creation_err}"
+                reply_text += _RESUBMIT_HINT
+                await _persist(req, stored_rewrite, intent, reply_text, data=payload, effective_user_id=effective_user_id)
+                return ChatResponse(reply=reply_text, data=payload), False
+
+        response, _ = await submissions.run(
+            key, req.conversation_id, flow_state.flow_id, req.message, submit_pool, keep=_submission_succeeded
+        )
+        return response
 
-    client = OpenSeaClient()
+    client = opensea
 
     if intent == "opensea_trending":
-        limit = int((req.params or {}).get("limit", 20))
+        limit = _trending_args(req.params)["limit"]
         data = await client.get_trending_collections(limit=limit)
         logger.info("[Chat] Trending fetched: %d items", len(data) if isinstance(data, list) else -1)
         
         # Generate natural language response using LLM
         responder = CollectionsResponder()
-        reply_text = await responder.generate_trending_response(req.message, data, limit)
+        reply_text = await responder.generate_trending_response(req.message, data, limit, on_token=on_token, render=_render_mode(req.params))
         
-        _persist(db, req, rewritten, intent, reply_text, data, effective_user_id=effective_user_id)
+        await _persist(req, stored_rewrite, intent, reply_text, data, effective_user_id=effective_user_id)
         return ChatResponse(
             reply=reply_text,
         )
 
     if intent == "opensea_volume":
-        params = req.params or {}
-        days = int(params.get("days", 7))
-        chain = params.get("chain")
-        raw_data = await client.get_collections_by_volume(days=days, chain=chain)
-        logger.info("[Chat] Volume fetched: params min=%s days=%s chain=%s", days, chain)
+        volume_args = _volume_args(req.params)
+        days, limit, chain = volume_args["days"], volume_args["limit"], volume_args["chain"]
+        raw_data = await client.get_collections_by_volume(**volume_args)
+        logger.info("[Chat] Volume fetched: params days=%s limit=%s chain=%s", days, limit, chain)
 
-        logger.info("[Chat] Volume data fetched: %s", raw_data)
+        logger.debug("[Chat] Volume data fetched: %s", raw_data)
         
         # Generate natural language response using LLM
         responder = CollectionsResponder()
-        reply_text = await responder.generate_volume_response(req.message, raw_data)
+        reply_text = await responder.generate_volume_response(req.message, raw_data, limit, on_token=on_token, render=_render_mode(req.params))
 
         logger.info("[Chat] Volume response: %s", reply_text)
         
-        _persist(db, req, rewritten, intent, reply_text, raw_data, effective_user_id=effective_user_id)
+        await _persist(req, stored_rewrite, intent, reply_text, raw_data, effective_user_id=effective_user_id)
         return ChatResponse(reply=reply_text)
 
     if intent == "opensea_collections":
@@ -459,9 +426,9 @@ async def handle_message(req: ChatRequest, db: Session = Depends(get_db)) -> Cha
         
         # Generate natural language response using LLM
         responder = CollectionsResponder()
-        reply_text = await responder.generate_collections_response(req.message, raw_data, order_by, limit)
+        reply_text = await responder.generate_collections_response(req.message, raw_data, order_by, limit, on_token=on_token, render=_render_mode(req.params))
 
-        _persist(db, req, rewritten, intent, reply_text, raw_data, effective_user_id=effective_user_id)
+        await _persist(req, stored_rewrite, intent, reply_text, raw_data, effective_user_id=effective_user_id)
         return ChatResponse(reply=reply_text)
 
     if intent == "retrieve_pools":
@@ -472,56 +439,32 @@ async def handle_message(req: ChatRequest, db: Session = Depends(get_db)) -> Cha
         # If no address provided, ask user for OpenSea link and resolve slug → address
         if not address:
             # Check if the current message contains an OpenSea link; if not, prompt the user
-            import re
-            m = re.search(r"https?://opensea\.io/collection/([a-z0-9\-]+)", req.message, flags=re.I)
-            if not m:
+            slug = find_collection_slug(req.message)
+            if not slug:
                 reply_text = "Please share the OpenSea collection link so I can look up its pools."
-                _persist(db, req, rewritten, intent, reply_text, effective_user_id=effective_user_id)
+                await _persist(req, stored_rewrite, intent, reply_text, effective_user_id=effective_user_id)
                 return ChatResponse(reply=reply_text)
 
-            slug = m.group(1)
-            client = OpenSeaClient()
-            coll = await client.get_collection(slug)
-            # Extract contract address from the collection response
-            nft_address = ""
-            try:
-                contracts = coll.get("contracts") or (
-                    coll.get("collection", {}).get("contracts") if isinstance(coll.get("collection"), dict) else []
-                )
-                if isinstance(contracts, list) and contracts:
-                    for c in contracts:
-                        if isinstance(c, dict) and c.get("address"):
-                            nft_address = c.get("address")
-                            break
-            except Exception:
-                nft_address = ""
-
-            if not nft_address:
+            contract = await collection_contracts.resolve(db, client, slug)
+            if contract is None:
                 reply_text = "I couldn't resolve the collection address from that link. Please try another link."
-                _persist(db, req, rewritten, intent, reply_text, data=coll, effective_user_id=effective_user_id)
+                await _persist(req, stored_rewrite, intent, reply_text, data={"collection_slug": slug}, effective_user_id=effective_user_id)
                 return ChatResponse(reply=reply_text)
-            address = nft_address
+            address = contract.address
 
         # Call FE route to fetch pools for the collection address
-        fe_base = os.getenv("FE_BASE_URL", "http://localhost:3002")
-        url = f"{fe_base}/api/pools/collection/{address}"
         pools_data: dict | None = None
         try:
-            headers = {
-                "x-internal-call": "true"
-            }
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, headers=headers) as resp:
-                    if resp.status == 200:
-                        pools_data = await resp.json()
-                    else:
-                        txt = await resp.text()
-                        reply_text = f"I couldn't fetch pools for that collection (status {resp.status})."
-                        _persist(db, req, rewritten, intent, reply_text, data={"response": txt}, effective_user_id=effective_user_id)
-                        return ChatResponse(reply=reply_text)
+            resp = await internal_api.get_pools_by_collection(address)
+            if resp.ok:
+                pools_data = resp.data
+            else:
+                reply_text = f"I couldn't fetch pools for that collection (status {resp.status})."
+                await _persist(req, stored_rewrite, intent, reply_text, data={"response": resp.text}, effective_user_id=effective_user_id)
+                return ChatResponse(reply=reply_text)
         except Exception as e:  # noqa: BLE001
             reply_text = f"Error calling pools API: {e}"
-            _persist(db, req, rewritten, intent, reply_text, effective_user_id=effective_user_id)
+            await _persist(req, stored_rewrite, intent, reply_text, effective_user_id=effective_user_id)
             return ChatResponse(reply=reply_text)
 
         # Build a rich markdown reply with requested fields
@@ -574,27 +517,16 @@ async def handle_message(req: ChatRequest, db: Session = Depends(get_db)) -> Cha
             ])
             
             reply_text = "\n".join(reply_lines)
-        _persist(db, req, rewritten, intent, reply_text, data=pools_data, effective_user_id=effective_user_id)
+        await _persist(req, stored_rewrite, intent, reply_text, data=pools_data, effective_user_id=effective_user_id)
         return ChatResponse(reply=reply_text, data=pools_data)
 
     if intent == "nft_statistics":
         # Check for cancellation
         if any(w in req.message.lower() for w in ["cancel", "stop", "abort"]):
             reply_text = "Okay, I've cancelled the NFT statistics request."
-            _persist(db, req, rewritten, intent, reply_text, effective_user_id=effective_user_id)
+            await _persist(req, stored_rewrite, intent, reply_text, effective_user_id=effective_user_id)
             return ChatResponse(reply=reply_text)
         
-        # Get conversation history for this conversation to check if we already asked for OpenSea link
-        history_pairs = []
-        if req.conversation_id:
-            history_msgs = db.execute(
-                text("SELECT user_question, ai_answer as assistant_reply FROM conversation_messages WHERE conversation_id = :conv_id ORDER BY created_at ASC"),
-                {"conv_id": req.conversation_id}
-            ).fetchall()
-            for msg in history_msgs:
-                if msg[0] and msg[1]:  # user_question and assistant_reply
-                    history_pairs.append(f"User: {msg[0]}\nAssistant: {msg[1]}")
-        
         # Check if we already asked for OpenSea link in this conversation
         asked_for_link = False
         if history_pairs:
@@ -604,29 +536,25 @@ async def handle_message(req: ChatRequest, db: Session = Depends(get_db)) -> Cha
                 asked_for_link = "please provide the opensea collection link or slug" in last_reply
         
         # Try to get a collection slug from the current message
-        import re
         text_msg = req.message  # Use original message, not rewritten
-        slug = None
-        m = re.search(r"opensea\.io/collection/([a-z0-9\-]+)", text_msg, flags=re.I)
-        if m:
-            slug = m.group(1)
+        slug = find_collection_slug(text_msg)
+        if slug:
             logger.info("[Chat] Extracted slug from OpenSea URL: %s", slug)
         
         # If no slug found and we haven't asked for link yet, ask for it
         if not slug and not asked_for_link:
             reply_text = "Please provide the OpenSea collection link or slug (e.g., https://opensea.io/collection/pudgypenguins) and I'll fetch the statistics for you."
-            _persist(db, req, rewritten, intent, reply_text, effective_user_id=effective_user_id)
+            await _persist(req, stored_rewrite, intent, reply_text, effective_user_id=effective_user_id)
             return ChatResponse(reply=reply_text)
         
         # If no slug found but we already asked, give error
         if not slug and asked_for_link:
             reply_text = "I couldn't find a valid OpenSea collection link in your message. Please provide a link like https://opensea.io/collection/pudgypenguins"
-            _persist(db, req, rewritten, intent, reply_text, effective_user_id=effective_user_id)
+            await _persist(req, stored_rewrite, intent, reply_text, effective_user_id=effective_user_id)
             return ChatResponse(reply=reply_text)
 
         # We have a slug, fetch the stats
         try:
-            client = OpenSeaClient()
             stats_data = await client.get_collection_stats(slug)
             logger.info("[Chat] Stats fetched for %s: %s", slug, list(stats_data.keys()) if isinstance(stats_data, dict) else "non-dict")
             
@@ -639,7 +567,7 @@ async def handle_message(req: ChatRequest, db: Session = Depends(get_db)) -> Cha
                 if "User:" in first_pair:
                     original_question = first_pair.split("User:", 1)[1].split("\nAssistant:", 1)[0].strip()
             
-            reply_text = await responder.generate_response(original_question, slug, stats_data)
+            reply_text = await responder.generate_response(original_question, slug, stats_data, on_token=on_token)
             
             # Also include structured data for frontend
             data = {
@@ -648,33 +576,17 @@ async def handle_message(req: ChatRequest, db: Session = Depends(get_db)) -> Cha
                 "opensea_url": f"https://opensea.io/collection/{slug}"
             }
             
-            _persist(db, req, rewritten, intent, reply_text, data, effective_user_id=effective_user_id)
+            await _persist(req, stored_rewrite, intent, reply_text, data, effective_user_id=effective_user_id)
             return ChatResponse(reply=reply_text, data=data)
             
         except Exception as e:
             logger.error("[Chat] Error fetching stats for %s: %s", slug, e)
             reply_text = f"Sorry, I couldn't fetch statistics for {slug}. The collection might not exist or there could be an API issue."
-            _persist(db, req, rewritten, intent, reply_text, effective_user_id=effective_user_id)
+            await _persist(req, stored_rewrite, intent, reply_text, effective_user_id=effective_user_id)
             return ChatResponse(reply=reply_text)
 
     # Handle pool investment flow
     if intent == "pool_invest":
-        import re
-        last_assistant = None
-        history_pairs: list[str] = []
-        if req.conversation_id:
-            history_msgs = db.execute(
-                text("SELECT user_question, ai_answer FROM conversation_messages WHERE conversation_id = :c ORDER BY created_at ASC"),
-                {"c": req.conversation_id}
-            ).fetchall()
-            for m in history_msgs:
-                if m[0] and m[1]:
-                    history_pairs.append(f"User: {m[0]}\nAssistant: {m[1]}")
-            if history_pairs:
-                last_pair = history_pairs[-1]
-                if "Assistant:" in last_pair:
-                    last_assistant = last_pair.split("Assistant:", 1)[1].strip().lower()
-
         def extract_pool_id(message: str) -> str | None:
             # Accept explicit patterns like "pool id: <id>" and bare IDs
             m = re.search(r"pool[_\- ]?id[:\s]*([a-zA-Z0-9_\-]+)", message, flags=re.I)
@@ -686,111 +598,209 @@ async def handle_message(req: ChatRequest, db: Session = Depends(get_db)) -> Cha
                 return bare
             return None
 
-        def extract_amount(message: str) -> float | None:
-            m = re.search(r"([0-9]+(?:[\.,][0-9]+)?)", message)
-            if not m:
-                return None
-            return float(m.group(1).replace(",", "."))
-
-        pool_id = None
-        amount = None
-        if last_assistant and ("how much" in last_assistant or "amount" in last_assistant):
-            amount = extract_amount(req.message)
-        elif last_assistant and ("pool id" in last_assistant or "pool_id" in last_assistant or "which pool" in last_assistant):
-            pool_id = extract_pool_id(req.message) or req.message.strip()
-        else:
-            # Even if the last assistant didn't ask, try to capture a bare id
-            pool_id = extract_pool_id(req.message) or pool_id
-
-        # Walk through conversation turns to backfill values similar to create_pool flow
-        conversation_turns: list[tuple[str, str]] = []
-        for pair in history_pairs:
-            if "User:" in pair and "Assistant:" in pair:
-                parts = pair.split("User:", 1)[1]
-                if "Assistant:" in parts:
-                    user_msg = parts.split("Assistant:", 1)[0].strip()
-                    assistant_msg = parts.split("Assistant:", 1)[1].strip().lower()
-                    conversation_turns.append((user_msg, assistant_msg))
-
-        for i, (user_msg, assistant_msg) in enumerate(conversation_turns):
-            if ("pool id" in assistant_msg or "pool_id" in assistant_msg or "which pool" in assistant_msg) and not pool_id:
-                next_user = conversation_turns[i + 1][0] if i + 1 < len(conversation_turns) else req.message
-                pool_id = extract_pool_id(next_user) or pool_id
-            if ("how much" in assistant_msg or "amount" in assistant_msg) and amount is None:
-                next_user = conversation_turns[i + 1][0] if i + 1 < len(conversation_turns) else req.message
-                amount = extract_amount(next_user) if amount is None else amount
-
+        if flow_state.flow != "pool_invest":
+            flow_state.start("pool_invest")
+        slots = flow_state.slots
+        if flow_state.awaiting == "amount":
+            amount_str = _parse_number(req.message)
+            if amount_str is not None:
+                slots["amount"] = float(amount_str)
+        elif flow_state.awaiting == "pool_id":
+            slots["pool_id"] = extract_pool_id(req.message) or req.message.strip()
+        elif not slots.get("pool_id"):
+            # Even if we didn't ask yet, try to capture a bare id
+            slots["pool_id"] = extract_pool_id(req.message)
+
+        pool_id = slots.get("pool_id")
+        amount = slots.get("amount")
         if not pool_id:
+            flow_state.awaiting = "pool_id"
+            await conversation_states.save(db, flow_state)
             reply_text = "To invest, please provide the pool_id you want to invest in."
-            _persist(db, req, rewritten, intent, reply_text, effective_user_id=effective_user_id)
+            await _persist(req, stored_rewrite, intent, reply_text, effective_user_id=effective_user_id)
             return ChatResponse(reply=reply_text)
 
         if amount is None:
+            flow_state.awaiting = "amount"
+            await conversation_states.save(db, flow_state)
             reply_text = "How much do you want to invest? Provide the amount in ETH (e.g., 0.25)."
-            _persist(db, req, rewritten, intent, reply_text, effective_user_id=effective_user_id)
+            await _persist(req, stored_rewrite, intent, reply_text, effective_user_id=effective_user_id)
             return ChatResponse(reply=reply_text)
 
-        fe_base = os.getenv("FE_BASE_URL", "http://localhost:3002")
-        url = f"{fe_base}/api/pool/invest"
-        invest_payload = {"poolId": pool_id, "amount": amount, "wallet_address": req.wallet_address}
-        logger.info("[Chat] Invest payload: %s", invest_payload)
-        try:
-            headers = {
-                "Content-Type": "application/json",
-                "x-internal-call": "true"
-            }
-            async with aiohttp.ClientSession() as session:
-                async with session.post(url, json=invest_payload, headers=headers) as resp:
-                    if resp.status == 200:
-                        data = await resp.json()
-                        reply_text = "✅ Investment submitted successfully."
-                        _persist(db, req, rewritten, intent, reply_text, data=data, effective_user_id=effective_user_id)
-                        return ChatResponse(reply=reply_text, data=data)
-                    else:
-                        txt = await resp.text()
-                        reply_text = f"❌ Failed to invest (status {resp.status}). {txt}"
-                        _persist(db, req, rewritten, intent, reply_text, data=invest_payload, effective_user_id=effective_user_id)
-                        return ChatResponse(reply=reply_text)
-        except Exception as e:
-            reply_text = f"Error calling invest API: {e}"
-            _persist(db, req, rewritten, intent, reply_text, data=invest_payload, effective_user_id=effective_user_id)
-            return ChatResponse(reply=reply_text)
+        key = idempotency_key(req.conversation_id, req.wallet_address, "pool_invest", flow_state.flow_id, slots)
+
+        async def submit_investment() -> Tuple[ChatResponse, bool]:
+            invest_payload = {"poolId": pool_id, "amount": amount, "wallet_address": req.wallet_address}
+            logger.info("[Chat] Invest payload: %s", invest_payload)
+            data: Dict[str, Any] | None = None
+            try:
+                resp = await internal_api.invest(invest_payload, idempotency_key=key)
+                if resp.ok:
+                    data = resp.data
+                    reply_text = "✅ Investment submitted successfully."
+                else:
+                    reply_text = f"❌ Failed to invest (status {resp.status}). {resp.text}"
+                succeeded = resp.ok
+            except Exception as e:
+                reply_text = f"Error calling invest API: {e}"
+                succeeded = False
+            # Runs shielded from this request (see submissions), so it owns its session
+            await _close_submission(flow_state, succeeded)
+            if succeeded:
+                await _persist(req, stored_rewrite, intent, reply_text, data=data, effective_user_id=effective_user_id)
+                return ChatResponse(reply=reply_text, data=data), True
+            reply_text += _RESUBMIT_HINT
+            await _persist(req, stored_rewrite, intent, reply_text, data=invest_payload, effective_user_id=effective_user_id)
+            return ChatResponse(reply=reply_text), False
+
+        response, _ = await submissions.run(
+            key, req.conversation_id, flow_state.flow_id, req.message, submit_investment, keep=_submission_succeeded
+        )
+        return response
 
     raise HTTPException(status_code=400, detail="Unsupported intent")
 
 
-def _persist(db: Session, req: ChatRequest, rewritten: str, intent: str, reply: str, data: Dict[str, Any] | None = None, *, effective_user_id: Optional[str] = None) -> None:
-    try:
-        rec = ConversationMessage(
-            user_id=effective_user_id,  # type: ignore[arg-type]
-            conversation_id=req.conversation_id or "",
-            user_question=req.message,
-            rewritten_question=rewritten,
-            intent=intent,
-            ai_answer=reply,
-        )
-        db.add(rec)
-        db.commit()
-    except Exception:
-        db.rollback()
+_RESUBMIT_HINT = " Your answers are kept: reply \"retry\" to submit them again or \"cancel\" to stop."
 
 
-def _get_or_create_user_id_by_wallet(db: Session, wallet_address: str) -> str:
-    """Return a stable user_id for a wallet. Create a lightweight user if needed.
+async def _close_submission(flow_state: FlowState, succeeded: bool) -> None:
+    """Save the flow after a pool create / invest submission.
 
-    This avoids requiring email/password for wallet-auth users.
+    The flow only ends once the submission went through; ``finish`` keeps its
+    flow_id so a retry of this turn can be replayed. After a failure the
+    slots are kept (including the answer given this turn) and nothing is
+    awaited, so the next message resubmits them unchanged.
     """
-    normalized = wallet_address.strip().lower()
-    existing = db.query(User).filter(User.wallet_address == normalized).first()
-    if existing:
-        return str(existing.user_id)
+    if succeeded:
+        flow_state.finish()
+    else:
+        flow_state.awaiting = None
+    async with AsyncSessionLocal() as db:
+        await conversation_states.save(db, flow_state)
+
+
+def _submission_succeeded(result: Tuple[ChatResponse, bool]) -> bool:
+    return result[1]
+
+
+def _trending_args(params: Dict[str, Any] | None) -> Dict[str, Any]:
+    return {"limit": int((params or {}).get("limit", settings.CHAT_TRENDING_LIMIT))}
+
+
+def _volume_args(params: Dict[str, Any] | None) -> Dict[str, Any]:
+    params = params or {}
+    return {
+        "days": int(params.get("days", settings.CHAT_VOLUME_DAYS)),
+        "limit": int(params.get("limit", settings.CHAT_VOLUME_LIMIT)),
+        "chain": params.get("chain"),
+    }
 
-    # Create a minimal user record with just wallet_address
-    new_user = User(wallet_address=normalized)
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
-    return str(new_user.user_id)
+
+def _render_mode(params: Dict[str, Any] | None) -> str | None:
+    render = (params or {}).get("render")
+    return render if isinstance(render, str) else None
+
+
+# Strong references to in-flight prefetches: the event loop only holds tasks weakly
+_prefetch_tasks: Set[asyncio.Future[Any]] = set()
+
+
+def _prefetch_opensea(opensea: OpenSeaClient, intent: str, params: Dict[str, Any] | None) -> None:
+    """Warm the OpenSea cache for the fetch the intent's branch is about to make.
+
+    The branch's own call then coalesces onto the in-flight load or hits the cache.
+    Without a cache there is nothing to share, so nothing is started.
+    """
+    if opensea.cache is None:
+        return
+    try:
+        if intent == "opensea_trending":
+            coro = opensea.get_trending_collections(**_trending_args(params))
+        elif intent == "opensea_volume":
+            coro = opensea.get_collections_by_volume(**_volume_args(params))
+        else:
+            return
+    except (TypeError, ValueError):
+        # Bad params: let the branch surface the error
+        return
+    task = asyncio.ensure_future(coro)
+    _prefetch_tasks.add(task)
+    task.add_done_callback(_prefetch_tasks.discard)
+    task.add_done_callback(_log_prefetch_result)
+    logger.info("[Chat] Prefetching OpenSea data for %s", intent)
+
+
+def _log_prefetch_result(task: asyncio.Future[Any]) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning("[Chat] OpenSea prefetch failed: %s", task.exception())
+
+
+async def _speculate_intent(classifier: LLMIntentClassifier, req: ChatRequest, opensea: OpenSeaClient) -> Tuple[str, str]:
+    """Classify the raw message and prefetch OpenSea data once the intent is confident."""
+    intent, source = await classifier.classify_detailed(req.message)
+    if source != "fallback":
+        _prefetch_opensea(opensea, intent, req.params)
+    return intent, source
+
+
+async def _reconcile_intent(
+    classifier: LLMIntentClassifier,
+    message: str,
+    rewritten: str,
+    speculative: asyncio.Task[Tuple[str, str]],
+) -> str:
+    """Pick the intent for the rewritten query, reusing the speculative one when they agree.
+
+    The speculative result stands when the rewrite left the message (nearly)
+    unchanged; otherwise a fast local decision on the rewrite wins, and only a
+    genuinely different rewrite pays for a second LLM classification.
+    """
+    try:
+        spec_intent, source = await speculative
+    except Exception as e:  # noqa: BLE001
+        logger.warning("[Chat] Speculative classification failed: %s", e)
+        return await classifier.classify(rewritten)
+
+    original_n, rewritten_n = normalize_query(message), normalize_query(rewritten)
+    if original_n == rewritten_n:
+        logger.info("[Chat] Rewrite unchanged, using speculative intent %r (%s)", spec_intent, source)
+        return spec_intent
+    fast = classifier.classify_fast(rewritten)
+    if fast is not None:
+        if fast[0] != spec_intent:
+            logger.info("[Chat] Speculative intent %r overridden by %r (%s)", spec_intent, fast[0], fast[1])
+        return fast[0]
+    similarity = SequenceMatcher(None, original_n, rewritten_n).ratio()
+    if source != "fallback" and similarity >= settings.CHAT_SPECULATIVE_SIMILARITY:
+        logger.info("[Chat] Rewrite similar (%.2f), using speculative intent %r (%s)", similarity, spec_intent, source)
+        return spec_intent
+    logger.info("[Chat] Rewrite diverged (%.2f), reclassifying", similarity)
+    return await classifier.classify(rewritten)
+
+
+def _parse_number(text: str) -> str | None:
+    m = re.search(r"([0-9]+(?:[\.,][0-9]+)?)", text)
+    if not m:
+        return None
+    return m.group(1).replace(",", ".")
+
+
+async def _persist(req: ChatRequest, rewritten: Optional[str], intent: str, reply: str, data: Dict[str, Any] | None = None, *, effective_user_id: Optional[str] = None) -> None:
+    # Batched write-behind; in "sync" mode this returns once the row is committed
+    try:
+        await message_writer.submit({
+            "user_id": effective_user_id,
+            "conversation_id": req.conversation_id or "",
+            "user_question": req.message,
+            "rewritten_question": rewritten,
+            "intent": intent,
+            "ai_answer": reply,
+            "data": data,
+        })
+    except MessageWriteError as e:
+        # Persistence stays best-effort: the reply is still returned
+        logger.warning("[Chat] Turn of conversation %r not persisted: %s", req.conversation_id, e)
 
 
 class ConversationSummary(BaseModel):
@@ -800,44 +810,59 @@ class ConversationSummary(BaseModel):
 
 
 @router.get("/conversations")
-def list_conversations(user_id: Optional[str] = None, wallet_address: Optional[str] = None, db: Session = Depends(get_db)) -> list[ConversationSummary]:
-    # Fetch the latest message per conversation using a window function (avoids GROUP BY issues)
-    # Determine user_id from wallet if provided
+async def list_conversations(
+    response: Response,
+    user_id: Optional[str] = None,
+    wallet_address: Optional[str] = None,
+    before: Optional[str] = None,
+    after: Optional[str] = None,
+    since: Optional[str] = None,
+    limit: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db),
+) -> list[ConversationSummary]:
+    """Conversations, most recently active first, one keyset page at a time.
+
+    Cursors are returned in the X-Before-Cursor / X-After-Cursor headers: pass
+    ``before`` for older conversations, ``after`` (or an ISO ``since``) for ones
+    active more recently.
+    """
+    # Determine user_id from wallet if provided; an unknown wallet has no conversations
     if not user_id and wallet_address:
-        user_id = _get_or_create_user_id_by_wallet(db, wallet_address)
-
-    base = select(
-        ConversationMessage.conversation_id,
-        ConversationMessage.created_at,
-        ConversationMessage.user_question,
-        func.row_number()
-        .over(
-            partition_by=ConversationMessage.conversation_id,
-            order_by=ConversationMessage.created_at.desc(),
-        )
-        .label("rn"),
+        user_id = await wallet_users.resolve(db, wallet_address)
+        if user_id is None:
+            set_page_headers(response, oldest=None, newest=None, has_more=False)
+            return []
+
+    # Range scan on ix_conversations_user_last (user_id, last_message_at, last_message_id)
+    stmt = select(
+        Conversation.conversation_id,
+        Conversation.last_message_at,
+        Conversation.last_message_id,
+        Conversation.preview,
     )
     if user_id:
-        base = base.where(ConversationMessage.user_id == user_id)
-
-    subq = base.subquery()
-
-    stmt = (
-        select(
-            subq.c.conversation_id,
-            subq.c.created_at.label("last_message_at"),
-            func.substr(func.coalesce(subq.c.user_question, ""), 1, 80).label("preview"),
-        )
-        .where(subq.c.rn == 1)
-        .order_by(subq.c.created_at.desc())
+        stmt = stmt.where(Conversation.user_id == user_id)
+
+    rows, has_more = await keyset_page(
+        db,
+        stmt,
+        (Conversation.last_message_at, Conversation.last_message_id),
+        limit=clamp_limit(limit, settings.CHAT_CONVERSATIONS_PAGE_SIZE),
+        before=before,
+        after=after,
+        since=since,
+    )
+    set_page_headers(
+        response,
+        oldest=(rows[0][1], rows[0][2]) if rows else None,
+        newest=(rows[-1][1], rows[-1][2]) if rows else None,
+        has_more=has_more,
     )
-
-    rows = db.execute(stmt).all()
     return [
         ConversationSummary(
-            conversation_id=r[0], last_message_at=r[1].isoformat() if r[1] else "", preview=r[2] or ""
+            conversation_id=r[0], last_message_at=r[1].isoformat() if r[1] else "", preview=r[3] or ""
         )
-        for r in rows
+        for r in reversed(rows)
     ]
 
 
@@ -848,27 +873,56 @@ class ChatMessageItem(BaseModel):
 
 
 @router.get("/messages")
-def get_messages(
+async def get_messages(
     conversation_id: str,
+    response: Response,
     user_id: Optional[str] = None,
     wallet_address: Optional[str] = None,
-    db: Session = Depends(get_db),
+    before: Optional[str] = None,
+    after: Optional[str] = None,
+    since: Optional[str] = None,
+    limit: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db),
 ) -> list[ChatMessageItem]:
+    """Messages of a conversation in chronological order, one keyset page at a time.
+
+    Without cursors the latest ``limit`` stored turns are returned. Pass the
+    X-Before-Cursor header value as ``before`` to load older turns and the
+    X-After-Cursor value as ``after`` (or an ISO ``since``) to fetch only new ones.
+    """
     if not conversation_id:
         raise HTTPException(status_code=400, detail="conversation_id is required")
     if not user_id and wallet_address:
-        user_id = _get_or_create_user_id_by_wallet(db, wallet_address)
+        user_id = await wallet_users.resolve(db, wallet_address)
+        if user_id is None:
+            set_page_headers(response, oldest=None, newest=None, has_more=False)
+            return []
 
     stmt = select(ConversationMessage).where(ConversationMessage.conversation_id == conversation_id)
     if user_id:
         stmt = stmt.where(ConversationMessage.user_id == user_id)
-    stmt = stmt.order_by(ConversationMessage.created_at.asc())
-    rows = db.execute(stmt).scalars().all()
+    # Range scan on ix_conv_conv_created (conversation_id, created_at, message_id)
+    rows, has_more = await keyset_page(
+        db,
+        stmt,
+        (ConversationMessage.created_at, ConversationMessage.message_id),
+        limit=clamp_limit(limit, settings.CHAT_MESSAGES_PAGE_SIZE),
+        before=before,
+        after=after,
+        since=since,
+    )
+    messages = [row[0] for row in rows]
+    set_page_headers(
+        response,
+        oldest=(messages[0].created_at, messages[0].message_id) if messages else None,
+        newest=(messages[-1].created_at, messages[-1].message_id) if messages else None,
+        has_more=has_more,
+    )
 
     out: list[ChatMessageItem] = []
-    for r in rows:
+    for r in messages:
         if r.user_question:
             out.append(ChatMessageItem(role="user", content=r.user_question))
         if r.ai_answer:
-            out.append(ChatMessageItem(role="assistant", content=r.ai_answer))
-    return out
\ No newline at end of file
+            out.append(ChatMessageItem(role="assistant", content=r.ai_answer, data=r.data))
+    return out
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+import aiohttp
+from fastapi import APIRouter, Depends
+from pydantic import BaseModel, Field
+
+from ..core.config import settings
+from ..services.opensea_client import OpenSeaClient, OpenSeaUnavailableError, parse_collection_slug
+from .deps import get_opensea_client
+
+
+router = APIRouter(prefix="/collections", tags=["collections"])
+logger = logging.getLogger("scooby.collections")
+
+
+class CollectionStatsRequest(BaseModel):
+    # OpenSea collection links or bare slugs
+    collections: List[str] = Field(min_length=1, max_length=settings.COLLECTIONS_BATCH_MAX)
+
+
+class CollectionStatsResult(BaseModel):
+    input: str
+    slug: Optional[str] = None
+    ok: bool
+    stats: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    status: Optional[int] = None
+
+
+class CollectionStatsResponse(BaseModel):
+    results: List[CollectionStatsResult]
+    succeeded: int
+    failed: int
+
+
+async def _fetch_stats(
+    opensea: OpenSeaClient, slug: str, semaphore: asyncio.Semaphore
+) -> Dict[str, Any]:
+    async with semaphore:
+        try:
+            return {"ok": True, "stats": await opensea.get_collection_stats(slug), "status": 200}
+        except aiohttp.ClientResponseError as e:
+            return {"ok": False, "error": e.message or "OpenSea request failed", "status": e.status}
+        except OpenSeaUnavailableError as e:
+            return {"ok": False, "error": str(e), "status": 503}
+        except Exception as e:  # noqa: BLE001
+            logger.warning("[Collections] Stats for %s failed: %s", slug, e)
+            return {"ok": False, "error": "OpenSea request failed", "status": 502}
+
+
+@router.post("/stats", response_model=CollectionStatsResponse)
+async def get_collections_stats(
+    req: CollectionStatsRequest,
+    opensea: OpenSeaClient = Depends(get_opensea_client),
+) -> CollectionStatsResponse:
+    """Stats for many collections in one call.
+
+    Results come back in request order, one per input. A collection that
+    cannot be fetched gets ``ok: false`` with the upstream status instead of
+    failing the whole batch; duplicate inputs are fetched once.
+    """
+    slugs = {value: parse_collection_slug(value) for value in req.collections}
+    unique = sorted({slug for slug in slugs.values() if slug})
+    semaphore = asyncio.Semaphore(settings.COLLECTIONS_BATCH_CONCURRENCY)
+    fetched = await asyncio.gather(*(_fetch_stats(opensea, slug, semaphore) for slug in unique))
+    by_slug = dict(zip(unique, fetched))
+
+    results: List[CollectionStatsResult] = []
+    for value in req.collections:
+        slug = slugs[value]
+        if slug is None:
+            results.append(CollectionStatsResult(input=value, ok=False, error="Invalid collection slug or link", status=400))
+        else:
+            results.append(CollectionStatsResult(input=value, slug=slug, **by_slug[slug]))
+    succeeded = sum(1 for r in results if r.ok)
+    logger.info("[Collections] Batch stats: %d inputs, %d fetched, %d failed", len(results), len(unique), len(results) - succeeded)
+    return CollectionStatsResponse(results=results, succeeded=succeeded, failed=len(results) - succeeded)
@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+from fastapi import Request
+
+from ..services.internal_api import InternalApiClient
+from ..services.opensea_client import OpenSeaClient
+from ..services.opensea_prefetcher import OpenSeaPrefetcher
+
+
+def get_opensea_client(request: Request) -> OpenSeaClient:
+    """Return the process-wide OpenSeaClient created in the app lifespan."""
+    return request.app.state.opensea
+
+
+def get_internal_api(request: Request) -> InternalApiClient:
+    """Return the process-wide frontend API client created in the app lifespan."""
+    return request.app.state.internal_api
+
+
+def get_prefetcher(request: Request) -> OpenSeaPrefetcher:
+    """Return the background OpenSea prefetcher created in the app lifespan."""
+    return request.app.state.prefetcher
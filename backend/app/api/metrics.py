@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from typing import Any, Dict
+
+from fastapi import APIRouter, Depends
+
+from ..core.database import pool_status
+from ..services.collection_contracts import collection_contracts
+from ..services.internal_api import InternalApiClient
+from ..services.llm_cache import intent_cache, rewrite_cache
+from ..services.message_writer import message_writer
+from ..services.opensea_client import OpenSeaClient
+from ..services.opensea_prefetcher import OpenSeaPrefetcher
+from ..services.submissions import submissions
+from ..services.wallet_users import wallet_users
+from .deps import get_internal_api, get_opensea_client, get_prefetcher
+
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@router.get("")
+async def get_metrics(
+    opensea: OpenSeaClient = Depends(get_opensea_client),
+    prefetcher: OpenSeaPrefetcher = Depends(get_prefetcher),
+    internal_api: InternalApiClient = Depends(get_internal_api),
+) -> Dict[str, Any]:
+    """In-process counters for caches and pools, for dashboards and debugging."""
+    return {
+        "opensea_cache": opensea.cache_stats(),
+        "opensea_prefetcher": prefetcher.stats(),
+        "opensea_upstream": opensea.upstream_stats(),
+        "internal_api": internal_api.stats(),
+        "db_pool": pool_status(),
+        "message_writer": message_writer.stats(),
+        "llm_cache": {"rewrite": rewrite_cache.stats(), "intent": intent_cache.stats()},
+        "wallet_users": wallet_users.stats(),
+        "submissions": submissions.stats(),
+        "collection_contracts": collection_contracts.stats(),
+    }
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import base64
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Response
+from sqlalchemy import Select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import settings
+
+
+# Page metadata travels in headers so list endpoints keep returning plain arrays.
+# X-Before-Cursor is passed back as ``before`` to fetch older rows, X-After-Cursor
+# as ``after`` to fetch newer ones.
+BEFORE_CURSOR_HEADER = "X-Before-Cursor"
+AFTER_CURSOR_HEADER = "X-After-Cursor"
+HAS_MORE_HEADER = "X-Has-More"
+PAGE_HEADERS = [BEFORE_CURSOR_HEADER, AFTER_CURSOR_HEADER, HAS_MORE_HEADER]
+
+Cursor = Tuple[datetime, int]
+
+
+def encode_cursor(created_at: datetime, message_id: int) -> str:
+    """Opaque keyset cursor for the (created_at, message_id) position of a row."""
+    raw = f"{created_at.isoformat()}|{message_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, name: str = "cursor") -> Cursor:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, message_id = base64.urlsafe_b64decode(padded).decode().rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(message_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail=f"Invalid {name}")
+
+
+def parse_since(since: str) -> datetime:
+    """Parse a ``since`` value: an ISO-8601 timestamp (a trailing Z is accepted)."""
+    try:
+        return datetime.fromisoformat(since.replace("Z", "+00:00"))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid since (expected an ISO-8601 timestamp)")
+
+
+def clamp_limit(limit: Optional[int], default: int) -> int:
+    """Apply the server-side page size bounds to a client-supplied limit."""
+    if limit is None:
+        return min(default, settings.CHAT_PAGE_MAX_LIMIT)
+    return max(1, min(limit, settings.CHAT_PAGE_MAX_LIMIT))
+
+
+async def keyset_page(
+    db: AsyncSession,
+    stmt: Select[Any],
+    position: Tuple[Any, Any],
+    *,
+    limit: int,
+    before: Optional[str] = None,
+    after: Optional[str] = None,
+    since: Optional[str] = None,
+) -> Tuple[List[Any], bool]:
+    """Run one keyset page of ``stmt`` ordered by the (timestamp, id) ``position`` columns.
+
+    Without cursors the newest ``limit`` rows are returned. ``before`` pages back
+    from a cursor; ``after``/``since`` page forward from a cursor or timestamp.
+    Rows always come back oldest first, with a flag telling whether the limit
+    cut the page short.
+    """
+    created_col, id_col = position
+    key = tuple_(created_col, id_col)
+    if before:
+        stmt = stmt.where(key < tuple_(*decode_cursor(before, "before")))
+    if after:
+        stmt = stmt.where(key > tuple_(*decode_cursor(after, "after")))
+    if since:
+        stmt = stmt.where(created_col > parse_since(since))
+
+    forward = bool(after or since) and not before
+    if forward:
+        stmt = stmt.order_by(created_col.asc(), id_col.asc())
+    else:
+        stmt = stmt.order_by(created_col.desc(), id_col.desc())
+    # One extra row tells us whether another page exists
+    rows: Sequence[Any] = (await db.execute(stmt.limit(limit + 1))).all()
+    has_more = len(rows) > limit
+    page = list(rows[:limit])
+    if not forward:
+        page.reverse()
+    return page, has_more
+
+
+def set_page_headers(response: Response, *, oldest: Optional[Cursor], newest: Optional[Cursor], has_more: bool) -> None:
+    if oldest is not None:
+        response.headers[BEFORE_CURSOR_HEADER] = encode_cursor(*oldest)
+    if newest is not None:
+        response.headers[AFTER_CURSOR_HEADER] = encode_cursor(*newest)
+    response.headers[HAS_MORE_HEADER] = "true" if has_more else "false"
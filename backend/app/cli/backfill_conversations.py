@@ -0,0 +1,87 @@
+"""Rebuild the conversations summary table from conversation_messages.
+
+Usage (from backend/):
+    python -m app.cli.backfill_conversations [--conversation-id ID] [--dry-run]
+
+Every summary row is recomputed from the messages and overwrites the existing
+one, so the command is safe to re-run. The conversations table is locked (SHARE
+ROW EXCLUSIVE) before the recount, so the message writer's summary upserts wait
+until the backfill commits. A batch committed before the lock is part of the
+recount; any later batch adds its increment on top of the recount. Chat turns
+that persist messages stall for as long as the backfill runs, so run it off-peak
+or with --conversation-id.
+"""
+from __future__ import annotations
+
+import argparse
+from typing import Any, Dict
+
+from sqlalchemy import text
+
+from ..core.database import SessionLocal
+
+
+_BACKFILL_SQL = """
+    WITH counts AS (
+        SELECT conversation_id, count(*) AS message_count
+        FROM conversation_messages
+        WHERE TRUE {filter}
+        GROUP BY conversation_id
+    ),
+    last_message AS (
+        SELECT DISTINCT ON (conversation_id)
+               conversation_id, user_id, created_at, message_id,
+               substr(coalesce(user_question, ''), 1, 80) AS preview
+        FROM conversation_messages
+        WHERE TRUE {filter}
+        ORDER BY conversation_id, created_at DESC, message_id DESC
+    ),
+    last_intent AS (
+        SELECT DISTINCT ON (conversation_id) conversation_id, intent
+        FROM conversation_messages
+        WHERE intent IS NOT NULL {filter}
+        ORDER BY conversation_id, created_at DESC, message_id DESC
+    )
+    INSERT INTO conversations (conversation_id, user_id, last_message_at, last_message_id,
+                               preview, message_count, last_intent)
+    SELECT m.conversation_id, m.user_id, m.created_at, m.message_id,
+           m.preview, c.message_count, i.intent
+    FROM last_message m
+    JOIN counts c USING (conversation_id)
+    LEFT JOIN last_intent i USING (conversation_id)
+    ON CONFLICT (conversation_id) DO UPDATE SET
+        user_id = EXCLUDED.user_id,
+        last_message_at = EXCLUDED.last_message_at,
+        last_message_id = EXCLUDED.last_message_id,
+        preview = EXCLUDED.preview,
+        message_count = EXCLUDED.message_count,
+        last_intent = EXCLUDED.last_intent
+"""
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--conversation-id", default=None, help="only rebuild this conversation")
+    parser.add_argument("--dry-run", action="store_true", help="roll back instead of committing")
+    args = parser.parse_args()
+
+    params: Dict[str, Any] = {}
+    row_filter = ""
+    if args.conversation_id:
+        row_filter = "AND conversation_id = :conversation_id"
+        params["conversation_id"] = args.conversation_id
+
+    with SessionLocal() as db:
+        # Taken before the recount's snapshot; held until commit/rollback
+        db.execute(text("LOCK TABLE conversations IN SHARE ROW EXCLUSIVE MODE"))
+        result = db.execute(text(_BACKFILL_SQL.format(filter=row_filter)), params)
+        print(f"Upserted {result.rowcount} conversation summaries")
+        if args.dry_run:
+            db.rollback()
+            print("Dry run: rolled back")
+        else:
+            db.commit()
+
+
+if __name__ == "__main__":
+    main()
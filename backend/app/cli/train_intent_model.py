@@ -0,0 +1,103 @@
+"""Train the local intent model from labelled conversation_messages rows.
+
+Usage (from backend/):
+    python -m app.cli.train_intent_model [--out data/intent_model.json] [--holdout 0.2]
+
+Rows are (rewritten_question, intent). Flow-continuation turns (slot answers,
+links, pool names) are stored without a rewritten_question since their intent
+comes from the flow state, and are left out. A deterministic hash of the text
+decides the held-out split, so duplicates never straddle it. The model
+is only written when --out is given or --save is passed.
+"""
+from __future__ import annotations
+
+import argparse
+import re
+import zlib
+from collections import Counter
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import text
+
+from ..core.config import settings
+from ..core.database import SessionLocal
+from ..services.intent_classifier import INTENTS
+from ..services.local_intent_model import LocalIntentModel, evaluate
+
+
+_HAS_LETTERS = re.compile(r"[a-zA-Z]{2,}")
+
+
+def load_samples(limit: int) -> List[Tuple[str, str]]:
+    with SessionLocal() as db:
+        rows = db.execute(
+            text(
+                "SELECT rewritten_question, intent FROM conversation_messages "
+                "WHERE intent IS NOT NULL AND rewritten_question IS NOT NULL "
+                "ORDER BY message_id DESC LIMIT :limit"
+            ),
+            {"limit": limit},
+        ).fetchall()
+    return usable_samples(rows)
+
+
+def usable_samples(rows: Iterable[Tuple[Optional[str], Optional[str]]]) -> List[Tuple[str, str]]:
+    """Keep the (rewritten_question, intent) rows that carry an intent signal."""
+    samples: List[Tuple[str, str]] = []
+    for question, intent in rows:
+        # No rewrite means a flow-continuation turn, labelled by the flow
+        if question is None:
+            continue
+        question = question.strip()
+        # Skip bare slot answers (amounts, fees) that carry no intent signal
+        if intent in INTENTS and _HAS_LETTERS.search(question):
+            samples.append((question, intent))
+    return samples
+
+
+def split(samples: List[Tuple[str, str]], holdout: float) -> Tuple[List[Tuple[str, str]], List[Tuple[str, str]]]:
+    train: List[Tuple[str, str]] = []
+    test: List[Tuple[str, str]] = []
+    cutoff = int(holdout * 1000)
+    for sample in samples:
+        bucket = zlib.crc32(sample[0].lower().encode("utf-8")) % 1000
+        (test if bucket < cutoff else train).append(sample)
+    return train, test
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", default=None, help=f"where to write the model (default: {settings.INTENT_MODEL_PATH} with --save)")
+    parser.add_argument("--save", action="store_true", help="write the model to INTENT_MODEL_PATH")
+    parser.add_argument("--holdout", type=float, default=0.2, help="fraction of rows held out for evaluation")
+    parser.add_argument("--limit", type=int, default=200_000, help="most recent labelled rows to use")
+    parser.add_argument("--epochs", type=int, default=15)
+    parser.add_argument("--threshold", type=float, default=settings.INTENT_MODEL_THRESHOLD)
+    args = parser.parse_args()
+
+    samples = load_samples(args.limit)
+    if not samples:
+        raise SystemExit("No labelled rows found in conversation_messages")
+    train, test = split(samples, args.holdout)
+    print(f"Loaded {len(samples)} rows: {len(train)} train / {len(test)} held out")
+    print("Label counts:", dict(Counter(label for _, label in samples).most_common()))
+
+    model = LocalIntentModel.train(train, epochs=args.epochs)
+    for name, subset in (("train", train), ("held-out", test)):
+        if not subset:
+            continue
+        report = evaluate(model, subset, args.threshold)
+        print(
+            f"{name:>8}: accuracy={report['accuracy']:.3f} "
+            f"coverage@{args.threshold:.2f}={report['coverage']:.3f} "
+            f"confident_accuracy={report['confident_accuracy']:.3f} (n={int(report['samples'])})"
+        )
+
+    out = args.out or (settings.INTENT_MODEL_PATH if args.save else None)
+    if out:
+        model.save(out)
+        print(f"Model written to {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Generic, Hashable, Optional, TypeVar
+
+
+V = TypeVar("V")
+
+
+@dataclass
+class CacheEntry(Generic[V]):
+    value: V
+    stored_at: float
+    expires_at: float
+    stale_until: float
+
+    def is_fresh(self, now: float) -> bool:
+        return now < self.expires_at
+
+    def is_usable(self, now: float) -> bool:
+        return now < self.stale_until
+
+
+class TTLCache(Generic[V]):
+    """Bounded LRU map whose entries carry a freshness deadline and a stale window.
+
+    Entries past ``expires_at`` but before ``stale_until`` are still returned so that
+    callers can decide to serve them while refreshing. Not thread-safe; meant to be
+    used from a single event loop.
+    """
+
+    def __init__(self, maxsize: int = 512) -> None:
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, CacheEntry[V]]" = OrderedDict()
+        self.evictions = 0
+
+    def get(self, key: Hashable, now: Optional[float] = None) -> Optional[CacheEntry[V]]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        now = time.monotonic() if now is None else now
+        if not entry.is_usable(now):
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return entry
+
+    def set(self, key: Hashable, value: V, ttl: float, stale_ttl: float = 0.0) -> CacheEntry[V]:
+        now = time.monotonic()
+        entry = CacheEntry(value=value, stored_at=now, expires_at=now + ttl, stale_until=now + ttl + stale_ttl)
+        self._data[key] = entry
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+        return entry
+
+    def pop(self, key: Hashable) -> Optional[CacheEntry[V]]:
+        return self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"size": len(self._data), "maxsize": self.maxsize, "evictions": self.evictions}
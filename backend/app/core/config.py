@@ -17,12 +17,128 @@ class Settings(BaseSettings):
     # OpenSea
     OPENSEA_API_KEY: str | None = None
     OPENSEA_BASE_URL: str = "https://api.opensea.io/api/v2"
+    # Shared keep-alive connection pool (owned by the app lifespan)
+    OPENSEA_HTTP_LIMIT: int = 100
+    OPENSEA_HTTP_LIMIT_PER_HOST: int = 20
+    OPENSEA_HTTP_DNS_TTL: int = 300
+    OPENSEA_HTTP_KEEPALIVE_TIMEOUT: float = 30.0
+    OPENSEA_HTTP_TIMEOUT: float = 15.0
+    OPENSEA_HTTP_CONNECT_TIMEOUT: float = 5.0
+    # Response cache: per-endpoint freshness (seconds), then a stale-while-revalidate window
+    OPENSEA_CACHE_MAXSIZE: int = 512
+    OPENSEA_CACHE_TTL_TRENDING: float = 60.0
+    OPENSEA_CACHE_TTL_VOLUME: float = 300.0
+    OPENSEA_CACHE_TTL_COLLECTIONS: float = 300.0
+    OPENSEA_CACHE_TTL_COLLECTION: float = 3600.0
+    OPENSEA_CACHE_TTL_STATS: float = 60.0
+    OPENSEA_CACHE_STALE_TTL: float = 600.0
+    # Upstream protection: token bucket sized to the API key quota, retries with
+    # jittered exponential backoff (Retry-After wins when longer), an AIMD
+    # concurrency cap that shrinks on 429s, and a circuit breaker
+    OPENSEA_RATE_LIMIT: float = 4.0
+    OPENSEA_RATE_BURST: int = 8
+    OPENSEA_RETRY_ATTEMPTS: int = 3
+    OPENSEA_RETRY_BASE_DELAY: float = 0.5
+    OPENSEA_RETRY_MAX_DELAY: float = 8.0
+    OPENSEA_CONCURRENCY_MIN: int = 2
+    OPENSEA_BREAKER_FAILURES: int = 5
+    OPENSEA_BREAKER_RESET: float = 30.0
+    # Background prefetcher: refreshes the chat's default trending/volume lists and
+    # the most requested stats slugs before they expire. The budget caps upstream
+    # calls per cycle; jitter is a fraction of the interval.
+    OPENSEA_PREFETCH_ENABLED: bool = True
+    OPENSEA_PREFETCH_INTERVAL: float = 30.0
+    OPENSEA_PREFETCH_JITTER: float = 0.2
+    OPENSEA_PREFETCH_BUDGET: int = 10
+    OPENSEA_PREFETCH_TOP_SLUGS: int = 8
+    # POST /collections/stats: max collections per request and upstream fetches in
+    # flight per request (all requests still share the client's rate limiter)
+    COLLECTIONS_BATCH_MAX: int = 100
+    COLLECTIONS_BATCH_CONCURRENCY: int = 10
+    # In-process slug -> contract entries in front of the collection_contracts table
+    COLLECTION_CONTRACTS_CACHE_SIZE: int = 10000
+
+    # Internal Next.js API (pool create / list / invest), called server-to-server
+    # over one keep-alive pool. Timeouts are per route and bound the whole call;
+    # only the pools listing (GET) is retried.
+    FE_BASE_URL: str = "http://localhost:3002"
+    FE_HTTP_LIMIT: int = 20
+    FE_HTTP_DNS_TTL: int = 300
+    FE_HTTP_KEEPALIVE_TIMEOUT: float = 30.0
+    FE_HTTP_CONNECT_TIMEOUT: float = 3.0
+    FE_TIMEOUT_POOL_CREATE: float = 20.0
+    FE_TIMEOUT_POOLS: float = 5.0
+    FE_TIMEOUT_INVEST: float = 20.0
+    FE_RETRY_ATTEMPTS: int = 2
+    FE_RETRY_BASE_DELAY: float = 0.2
+    FE_RETRY_MAX_DELAY: float = 2.0
+    # Pools-by-collection listings, shared across requests; dropped when this
+    # backend creates a pool or submits an investment for the collection
+    FE_POOLS_CACHE_TTL: float = 15.0
+    FE_POOLS_CACHE_SIZE: int = 512
 
     # OpenAI
     OPENAI_API_KEY: str | None = None
+    # Shared AsyncOpenAI connection pool (one per process)
+    OPENAI_MAX_CONNECTIONS: int = 100
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    OPENAI_TIMEOUT: float = 30.0
+    OPENAI_MAX_RETRIES: int = 2
+
+    # Chat
+    CHAT_HISTORY_TURNS: int = 20
+    # Defaults for list intents when the request carries no params (also prefetched)
+    CHAT_TRENDING_LIMIT: int = 20
+    CHAT_VOLUME_DAYS: int = 7
+    CHAT_VOLUME_LIMIT: int = 20
+    CHAT_STATE_CACHE_SIZE: int = 4096
+    CHAT_STATE_CACHE_TTL: float = 3600.0
+    # Write-behind persistence of conversation messages.
+    # "sync" waits for the batch holding the message to commit before replying;
+    # "async" replies immediately (fire-and-forget, drained on shutdown).
+    CHAT_PERSIST_MODE: str = "sync"
+    CHAT_PERSIST_BATCH_SIZE: int = 100
+    CHAT_PERSIST_FLUSH_INTERVAL: float = 0.005
+    CHAT_PERSIST_QUEUE_SIZE: int = 10000
+    # Classify the raw message while the rewriter runs; the speculative intent is
+    # kept when the rewrite barely changed the message (similarity ratio below)
+    CHAT_SPECULATIVE_PIPELINE: bool = True
+    CHAT_SPECULATIVE_SIMILARITY: float = 0.85
+    # How trending/volume/collections replies are produced: "llm" or "template"
+    # (overridable per request with params.render). In "llm" mode the template is
+    # used when the LLM produces no output within CHAT_LLM_RENDER_TIMEOUT seconds;
+    # a reply that has started is always awaited in full (streaming or not).
+    CHAT_RENDER_MODE: str = "llm"
+    CHAT_LLM_RENDER_TIMEOUT: float = 8.0
+    # Page sizes for /chat/conversations and /chat/messages (messages count stored
+    # turns, i.e. one user question plus its answer)
+    CHAT_CONVERSATIONS_PAGE_SIZE: int = 50
+    CHAT_MESSAGES_PAGE_SIZE: int = 100
+    CHAT_PAGE_MAX_LIMIT: int = 200
+    # Pool create / invest submissions: duplicates of an in-flight submission
+    # (same conversation, wallet and answers) wait for it, and completed ones are
+    # replayed to client retries for this many seconds
+    CHAT_SUBMISSION_RETENTION: float = 300.0
+    CHAT_SUBMISSION_STORE_SIZE: int = 4096
+    # Wallet -> user_id lookups cached in-process (user ids never change)
+    WALLET_CACHE_SIZE: int = 10000
+    WALLET_CACHE_TTL: float = 86400.0
+
+    # Result cache for the query rewriter and intent classifier
+    LLM_CACHE_SIZE: int = 4096
+    LLM_CACHE_TTL: float = 3600.0
+
+    # Local intent model (fast path in front of the LLM classifier)
+    INTENT_MODEL_PATH: str = "data/intent_model.json"
+    INTENT_MODEL_THRESHOLD: float = 0.85
 
     # Database
     DATABASE_URL: str | None = None
+    # Connection pool sizing (applies to both the sync and async engines)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
 
     # SMTP (optional). If set, verification emails will be sent.
     SMTP_HOST: str | None = None
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
 import os
-from typing import Generator
+from typing import Any, AsyncGenerator, Generator
 
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
 
 from .config import settings
@@ -33,15 +34,33 @@ connect_args: dict[str, str] = {}
 if "sslmode=" not in DATABASE_URL:
     connect_args["sslmode"] = "require"
 
+_pool_args: dict[str, Any] = {
+    "pool_size": settings.DB_POOL_SIZE,
+    "max_overflow": settings.DB_MAX_OVERFLOW,
+    "pool_timeout": settings.DB_POOL_TIMEOUT,
+    "pool_recycle": settings.DB_POOL_RECYCLE,
+}
+
 engine = create_engine(
     DATABASE_URL,
     pool_pre_ping=True,
     future=True,
     connect_args=connect_args,
+    **_pool_args,
 )
 
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
 
+# Async engine for request handlers. psycopg 3 serves both engines with the same URL.
+async_engine = create_async_engine(
+    DATABASE_URL,
+    pool_pre_ping=True,
+    connect_args=connect_args,
+    **_pool_args,
+)
+
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
 
 def get_db() -> Generator[Session, None, None]:
     db = SessionLocal()
@@ -50,4 +69,20 @@ def get_db() -> Generator[Session, None, None]:
     finally:
         db.close()
 
- 
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def pool_status() -> dict[str, Any]:
+    """Snapshot of the async engine's connection pool for monitoring."""
+    pool = async_engine.pool
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "checked_out": pool.checkedout(),  # type: ignore[attr-defined]
+        "checked_in": pool.checkedin(),  # type: ignore[attr-defined]
+        "overflow": pool.overflow(),  # type: ignore[attr-defined]
+        "status": pool.status(),
+    }
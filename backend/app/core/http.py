@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from typing import Dict, Optional
+
+import aiohttp
+
+
+def create_client_session(
+    *,
+    limit: int,
+    limit_per_host: int,
+    dns_ttl: int,
+    keepalive_timeout: float,
+    total_timeout: float,
+    connect_timeout: float,
+    headers: Optional[Dict[str, str]] = None,
+) -> aiohttp.ClientSession:
+    """Build a keep-alive ClientSession backed by a bounded, DNS-caching connector.
+
+    Must be called from inside a running event loop (e.g. the app lifespan). The
+    caller owns the session and is responsible for closing it on shutdown.
+    """
+    connector = aiohttp.TCPConnector(
+        limit=limit,
+        limit_per_host=limit_per_host,
+        use_dns_cache=True,
+        ttl_dns_cache=dns_ttl,
+        keepalive_timeout=keepalive_timeout,
+    )
+    timeout = aiohttp.ClientTimeout(total=total_timeout, sock_connect=connect_timeout)
+    return aiohttp.ClientSession(connector=connector, timeout=timeout, headers=headers)
@@ -1,10 +1,22 @@
 import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from .core.config import settings
+from .core.database import async_engine
 from .api.chat import router as chat_router
 from .api.auth import router as auth_router
+from .api.collections import router as collections_router
+from .api.metrics import router as metrics_router
+from .api.pagination import PAGE_HEADERS
+from .services.internal_api import InternalApiClient, create_internal_api_session
+from .services.llm import close_openai_client
+from .services.local_intent_model import load_local_intent_model
+from .services.message_writer import message_writer
+from .services.opensea_client import OpenSeaCache, OpenSeaClient, create_opensea_session
+from .services.opensea_prefetcher import OpenSeaPrefetcher
 
 
 # Basic logging config (visible in console)
@@ -14,7 +26,34 @@ logging.basicConfig(
 )
 logger = logging.getLogger("scooby")
 
-app = FastAPI(title=settings.PROJECT_NAME)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One keep-alive connection pool per process, shared by every request
+    opensea_session = create_opensea_session()
+    app.state.opensea = OpenSeaClient(session=opensea_session, cache=OpenSeaCache())
+    logger.info("OpenSea session opened (limit_per_host=%d)", settings.OPENSEA_HTTP_LIMIT_PER_HOST)
+    internal_api_session = create_internal_api_session()
+    app.state.internal_api = InternalApiClient(session=internal_api_session)
+    app.state.prefetcher = OpenSeaPrefetcher(app.state.opensea)
+    if settings.OPENSEA_PREFETCH_ENABLED:
+        app.state.prefetcher.start()
+    await message_writer.start()
+    load_local_intent_model()
+    try:
+        yield
+    finally:
+        await app.state.prefetcher.stop()
+        # Drain queued messages while the DB pool is still open
+        await message_writer.stop()
+        await opensea_session.close()
+        await internal_api_session.close()
+        await close_openai_client()
+        await async_engine.dispose()
+        logger.info("OpenSea and frontend sessions, OpenAI client and DB pool closed")
+
+
+app = FastAPI(title=settings.PROJECT_NAME, lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -22,6 +61,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=PAGE_HEADERS,
 )
 
 
@@ -33,5 +73,7 @@ async def root():
 
 app.include_router(chat_router)
 app.include_router(auth_router)
+app.include_router(collections_router)
+app.include_router(metrics_router)
 
 
@@ -3,7 +3,10 @@ from __future__ import annotations
 from datetime import datetime
 import uuid
 
+from typing import Any
+
 from sqlalchemy import String, DateTime, func, BigInteger, Text, Index
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
 
@@ -34,10 +37,56 @@ class ConversationMessage(Base):
     rewritten_question: Mapped[str | None] = mapped_column(Text, nullable=True)
     intent: Mapped[str | None] = mapped_column(String(64), nullable=True)
     ai_answer: Mapped[str | None] = mapped_column(Text, nullable=True)
+    data: Mapped[dict[str, Any] | None] = mapped_column(JSONB, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
     __table_args__ = (
         Index("ix_conv_user_id", "user_id"),
         Index("ix_conv_conversation_id", "conversation_id"),
         Index("ix_conv_user_conv_created", "user_id", "conversation_id", "created_at"),
-    )
\ No newline at end of file
+        Index("ix_conv_conv_created", "conversation_id", "created_at", "message_id"),
+    )
+
+
+class ConversationState(Base):
+    __tablename__ = "conversation_state"
+
+    # Active structured flow (create_pool / pool_invest) and the slots collected so far
+    conversation_id: Mapped[str] = mapped_column(String(128), primary_key=True)
+    user_id: Mapped[str | None] = mapped_column(String(36), nullable=True)
+    flow: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    awaiting: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    slots: Mapped[dict[str, Any]] = mapped_column(JSONB, default=dict, server_default="{}")
+    # One run of the flow; kept after a successful submission to recognise its retries
+    flow_id: Mapped[str | None] = mapped_column(String(32), nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+
+class Conversation(Base):
+    __tablename__ = "conversations"
+
+    # One row per conversation, maintained by the message writer on every insert
+    conversation_id: Mapped[str] = mapped_column(String(128), primary_key=True)
+    user_id: Mapped[str | None] = mapped_column(String(36), nullable=True)
+    last_message_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    last_message_id: Mapped[int] = mapped_column(BigInteger)
+    preview: Mapped[str] = mapped_column(Text, default="", server_default="")
+    message_count: Mapped[int] = mapped_column(BigInteger, default=0, server_default="0")
+    last_intent: Mapped[str | None] = mapped_column(String(64), nullable=True)
+
+    __table_args__ = (
+        Index("ix_conversations_user_last", "user_id", "last_message_at", "last_message_id"),
+    )
+
+
+class CollectionContract(Base):
+    __tablename__ = "collection_contracts"
+
+    # OpenSea slug -> NFT contract; filled on first resolve and from prefetched lists
+    slug: Mapped[str] = mapped_column(String(128), primary_key=True)
+    address: Mapped[str] = mapped_column(String(128))
+    chain: Mapped[str] = mapped_column(String(64))
+    chain_id: Mapped[int] = mapped_column(BigInteger)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import logging
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.cache import TTLCache
+from ..core.config import settings
+from ..core.database import AsyncSessionLocal
+from ..models.models import CollectionContract
+from .opensea_client import OpenSeaClient
+from .payload_projection import collection_rows
+
+logger = logging.getLogger("scooby.collection_contracts")
+
+
+# OpenSea chain identifiers -> chain ids expected by the frontend pool routes
+CHAIN_IDS: Dict[str, int] = {"shape": 360, "shape-sepolia": 11011, "shapeSepolia": 11011}
+DEFAULT_CHAIN = "shapeSepolia"
+
+
+def chain_id_for(chain: Optional[str]) -> int:
+    return CHAIN_IDS.get(str(chain), CHAIN_IDS[DEFAULT_CHAIN])
+
+
+def normalize_slug(slug: str) -> str:
+    return slug.strip().split("/")[-1].lower()
+
+
+@dataclass(frozen=True)
+class NftContract:
+    address: str
+    chain: str
+    chain_id: int
+
+
+def extract_contract(payload: Any) -> Optional[NftContract]:
+    """Pick the NFT contract out of an OpenSea collection object.
+
+    Accepts the GET /collections/{slug} response (possibly wrapping the
+    collection under ``collection``) or one item of a collection list.
+    """
+    coll = payload
+    if isinstance(payload, dict) and isinstance(payload.get("collection"), dict):
+        coll = payload["collection"]
+    if not isinstance(coll, dict):
+        return None
+    candidates = []
+    for field in ("primary_asset_contracts", "contracts"):
+        if isinstance(coll.get(field), list):
+            candidates.extend(coll[field])
+    for c in candidates:
+        if isinstance(c, dict) and c.get("address"):
+            chain = c.get("chain") or coll.get("chain") or DEFAULT_CHAIN
+            return NftContract(address=c["address"], chain=chain, chain_id=chain_id_for(chain))
+    return None
+
+
+class CollectionContractIndex:
+    """Slug -> NFT contract (address, chain, chain_id), kept in the
+    collection_contracts table with an in-process LRU in front.
+
+    The mapping does not change once a collection is deployed, so entries never
+    expire. Misses fall through to the table, then to OpenSea; list payloads the
+    prefetcher already fetched are fed to ``seed`` so most slugs resolve without
+    a network call. Database errors only disable persistence, never resolution.
+    """
+
+    def __init__(self, maxsize: int | None = None) -> None:
+        self._cache: TTLCache[NftContract] = TTLCache(maxsize or settings.COLLECTION_CONTRACTS_CACHE_SIZE)
+        self.counters: Dict[str, int] = {"hits": 0, "db_hits": 0, "fetches": 0, "seeded": 0, "db_errors": 0}
+
+    def _remember(self, slug: str, contract: NftContract) -> None:
+        self._cache.set(slug, contract, ttl=math.inf)
+
+    def get(self, slug: str) -> Optional[NftContract]:
+        entry = self._cache.get(normalize_slug(slug))
+        return entry.value if entry is not None else None
+
+    async def resolve(self, db: AsyncSession, opensea: OpenSeaClient, slug: str) -> Optional[NftContract]:
+        """Return the contract for a slug, or None if OpenSea lists none."""
+        slug = normalize_slug(slug)
+        cached = self.get(slug)
+        if cached is not None:
+            self.counters["hits"] += 1
+            return cached
+        try:
+            row = (
+                await db.execute(select(CollectionContract).where(CollectionContract.slug == slug))
+            ).scalar_one_or_none()
+        except Exception as e:  # noqa: BLE001
+            self.counters["db_errors"] += 1
+            logger.warning("[CollectionContracts] Lookup of %s failed: %s", slug, e)
+            await db.rollback()
+            row = None
+        if row is not None:
+            self.counters["db_hits"] += 1
+            contract = NftContract(address=row.address, chain=row.chain, chain_id=row.chain_id)
+            self._remember(slug, contract)
+            return contract
+
+        self.counters["fetches"] += 1
+        contract = extract_contract(await opensea.get_collection(slug))
+        if contract is None:
+            return None
+        self._remember(slug, contract)
+        await self._store(db, {slug: contract})
+        return contract
+
+    async def seed(self, payload: Any) -> int:
+        """Index the contracts found in an OpenSea collection list payload.
+
+        Returns the number of slugs that were not known yet.
+        """
+        found: Dict[str, NftContract] = {}
+        for item in collection_rows(payload):
+            slug = item.get("collection") or item.get("slug")
+            if not isinstance(slug, str) or not slug:
+                continue
+            slug = normalize_slug(slug)
+            if slug in found or self.get(slug) is not None:
+                continue
+            contract = extract_contract(item)
+            if contract is not None:
+                found[slug] = contract
+        if not found:
+            return 0
+        for slug, contract in found.items():
+            self._remember(slug, contract)
+        self.counters["seeded"] += len(found)
+        async with AsyncSessionLocal() as db:
+            await self._store(db, found)
+        return len(found)
+
+    async def _store(self, db: AsyncSession, contracts: Dict[str, NftContract]) -> None:
+        rows = [
+            {"slug": slug, "address": c.address, "chain": c.chain, "chain_id": c.chain_id}
+            for slug, c in sorted(contracts.items())
+        ]
+        stmt = insert(CollectionContract).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[CollectionContract.slug],
+            set_={
+                "address": stmt.excluded.address,
+                "chain": stmt.excluded.chain,
+                "chain_id": stmt.excluded.chain_id,
+                "updated_at": func.now(),
+            },
+        )
+        try:
+            await db.execute(stmt)
+            await db.commit()
+        except Exception as e:  # noqa: BLE001
+            self.counters["db_errors"] += 1
+            logger.warning("[CollectionContracts] Failed to store %d contracts: %s", len(rows), e)
+            await db.rollback()
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.counters, **self._cache.stats()}
+
+
+collection_contracts = CollectionContractIndex()
@@ -1,12 +1,12 @@
 from __future__ import annotations
 
-import json
 import logging
 from typing import Any, Dict, List
 
-from openai import OpenAI
-
 from ..core.config import settings
+from .llm import TokenCallback, complete_chat, get_openai_client
+from .payload_projection import log_prompt_size, project_collections, to_table
+from .template_renderer import RENDER_MODES, render_collections, render_trending, render_volume
 
 logger = logging.getLogger("scooby.collections_responder")
 
@@ -15,24 +15,35 @@ class CollectionsResponder:
     """Generate natural language responses from NFT collections data (volume/trending/collections)."""
     
     def __init__(self, api_key: str | None = None) -> None:
-        key = api_key or getattr(settings, "OPENAI_API_KEY", None) or getattr(settings, "openai_api_key", None)
-        if not key:
-            self.client = None
-        else:
-            self.client = OpenAI(api_key=key)
+        self.client = get_openai_client(api_key)
+
+    def _use_llm(self, render: str | None) -> bool:
+        """Whether to phrase the reply with the LLM rather than the markdown template."""
+        mode = render if render in RENDER_MODES else settings.CHAT_RENDER_MODE
+        return mode != "template" and self.client is not None
 
-    async def generate_volume_response(self, user_question: str, raw_data: Dict[str, Any]) -> str:
+    async def generate_volume_response(
+        self,
+        user_question: str,
+        raw_data: Dict[str, Any],
+        limit: int | None = None,
+        on_token: TokenCallback | None = None,
+        render: str | None = None,
+    ) -> str:
         """Generate a natural language response from volume data.
         
         Args:
             user_question: The original user question
             raw_data: The raw volume JSON from OpenSea API
-            min_volume: Minimum volume filter used
-            days: Days filter used
+            limit: Maximum number of collections to include in the prompt
+            on_token: Optional callback; when set the reply is streamed token by token
+            render: "llm" or "template"; defaults to settings.CHAT_RENDER_MODE
             
         Returns:
             Natural language response summarizing the volume data
         """
+        if not self._use_llm(render):
+            return render_volume(raw_data, limit)
         
         try:
             system_prompt = (
@@ -47,29 +58,43 @@ class CollectionsResponder:
                 "Make it engaging and visually striking!"
             )
             
+            rows = project_collections(raw_data, limit)
             user_prompt = (
                 f"User asked: '{user_question}'\n"
-                f"Collections data: {raw_data}\n\n"
+                f"Collections data ({len(rows)} rows, sorted by volume):\n{to_table(rows)}\n\n"
             )
             
-            response = self.client.chat.completions.create(
+            messages = [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ]
+            log_prompt_size("volume", messages)
+            reply = await complete_chat(
+                self.client,
+                on_token=on_token,
                 model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
+                messages=messages,
                 temperature=0.7,
-                max_tokens=1000
+                max_tokens=1000,
+                timeout=settings.CHAT_LLM_RENDER_TIMEOUT,
             )
             
-            reply = response.choices[0].message.content or ""
             logger.info("[CollectionsResponder] Generated volume response: %s", reply[:100])
             return reply.strip()
             
         except Exception as e:
-            logger.warning("[CollectionsResponder] LLM failed for volume: %s", e)
+            logger.warning("[CollectionsResponder] LLM failed for volume, using template: %r", e)
+            return render_volume(raw_data, limit)
 
-    async def generate_collections_response(self, user_question: str, raw_data: Dict[str, Any], order_by: str, limit: int) -> str:
+    async def generate_collections_response(
+        self,
+        user_question: str,
+        raw_data: Dict[str, Any],
+        order_by: str,
+        limit: int,
+        on_token: TokenCallback | None = None,
+        render: str | None = None,
+    ) -> str:
         """Generate a natural language response from collections data.
         
         Args:
@@ -77,12 +102,14 @@ class CollectionsResponder:
             raw_data: The raw collections JSON from OpenSea API
             order_by: Sorting criteria used
             limit: Number of collections limit
+            on_token: Optional callback; when set the reply is streamed token by token
+            render: "llm" or "template"; defaults to settings.CHAT_RENDER_MODE
             
         Returns:
             Natural language response summarizing the collections data
         """
-        if not self.client:
-            return f"Found collections data ordered by {order_by}. OpenAI client not configured."
+        if not self._use_llm(render):
+            return render_collections(raw_data, order_by, limit)
         
         try:
             system_prompt = (
@@ -101,41 +128,54 @@ class CollectionsResponder:
             user_prompt = (
                 f"User asked: '{user_question}'\n"
                 f"Query: Top {limit} collections ordered by {order_by}\n"
-                f"Collections data: {json.dumps(raw_data, indent=2)}\n\n"
+                f"Collections data:\n{to_table(project_collections(raw_data, limit))}\n\n"
                 f"Generate a natural, conversational response that highlights the top collections and trends."
             )
             
-            response = self.client.chat.completions.create(
+            messages = [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ]
+            log_prompt_size("collections", messages)
+            reply = await complete_chat(
+                self.client,
+                on_token=on_token,
                 model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
+                messages=messages,
                 temperature=0.7,
-                max_tokens=1000
+                max_tokens=1000,
+                timeout=settings.CHAT_LLM_RENDER_TIMEOUT,
             )
             
-            reply = response.choices[0].message.content or ""
             logger.info("[CollectionsResponder] Generated collections response: %s", reply[:100])
             return reply.strip()
             
         except Exception as e:
-            logger.warning("[CollectionsResponder] LLM failed for collections: %s", e)
-            return f"Found collections data ordered by {order_by}. Check the raw data for detailed information."
+            logger.warning("[CollectionsResponder] LLM failed for collections, using template: %r", e)
+            return render_collections(raw_data, order_by, limit)
 
-    async def generate_trending_response(self, user_question: str, data: List[Dict[str, Any]], limit: int) -> str:
+    async def generate_trending_response(
+        self,
+        user_question: str,
+        data: Dict[str, Any] | List[Dict[str, Any]],
+        limit: int,
+        on_token: TokenCallback | None = None,
+        render: str | None = None,
+    ) -> str:
         """Generate a natural language response from trending data.
         
         Args:
             user_question: The original user question
-            data: The trending collections data
+            data: The trending collections data (raw OpenSea payload or list of collections)
             limit: Number of collections limit
+            on_token: Optional callback; when set the reply is streamed token by token
+            render: "llm" or "template"; defaults to settings.CHAT_RENDER_MODE
             
         Returns:
             Natural language response summarizing the trending data
         """
-        if not self.client:
-            return f"Found {len(data)} trending collections. OpenAI client not configured."
+        if not self._use_llm(render):
+            return render_trending(data, limit)
         
         try:
             system_prompt = (
@@ -151,29 +191,34 @@ class CollectionsResponder:
                 "Make it exciting and visually striking to capture the trending momentum!"
             )
             
+            rows = project_collections(data, limit)
             user_prompt = (
                 f"User asked: '{user_question}'\n"
                 f"Query: Top {limit} trending collections by 24h volume\n"
-                f"Found {len(data)} trending collections\n"
-                f"Trending data: {json.dumps(data, indent=2)}\n\n"
+                f"Found {len(rows)} trending collections\n"
+                f"Trending data:\n{to_table(rows)}\n\n"
                 f"Generate a natural, conversational response that captures the trending excitement."
             )
             
-            response = self.client.chat.completions.create(
+            messages = [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ]
+            log_prompt_size("trending", messages)
+            reply = await complete_chat(
+                self.client,
+                on_token=on_token,
                 model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
+                messages=messages,
                 temperature=0.7,
-                max_tokens=1000
+                max_tokens=1000,
+                timeout=settings.CHAT_LLM_RENDER_TIMEOUT,
             )
             
-            reply = response.choices[0].message.content or ""
             logger.info("[CollectionsResponder] Generated trending response: %s", reply[:100])
             return reply.strip()
             
         except Exception as e:
-            logger.warning("[CollectionsResponder] LLM failed for trending: %s", e)
-            return f"Found {len(data)} trending collections. Check the raw data for detailed information."
+            logger.warning("[CollectionsResponder] LLM failed for trending, using template: %r", e)
+            return render_trending(data, limit)
     
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import settings
+
+
+@dataclass
+class ConversationTurn:
+    user_question: str
+    ai_answer: Optional[str]
+    intent: Optional[str]
+
+
+@dataclass
+class ConversationContext:
+    """The latest turns of a conversation (oldest -> newest) plus its last intent.
+
+    Loaded once per chat request and shared by every flow, so no branch has to
+    go back to the database for history.
+    """
+
+    conversation_id: Optional[str]
+    turns: List[ConversationTurn] = field(default_factory=list)
+    last_intent: Optional[str] = None
+
+    @property
+    def history_pairs(self) -> List[str]:
+        return [
+            f"User: {t.user_question}\nAssistant: {t.ai_answer}"
+            for t in self.turns
+            if t.user_question and t.ai_answer
+        ]
+
+    @property
+    def answered_turns(self) -> List[ConversationTurn]:
+        return [t for t in self.turns if t.user_question and t.ai_answer]
+
+    @property
+    def last_assistant(self) -> Optional[str]:
+        """Lower-cased text of the most recent assistant reply, if any."""
+        answered = self.answered_turns
+        return answered[-1].ai_answer.strip().lower() if answered else None  # type: ignore[union-attr]
+
+    @property
+    def last_user_question(self) -> Optional[str]:
+        answered = self.answered_turns
+        return answered[-1].user_question.strip() if answered else None
+
+    @property
+    def first_user_question(self) -> Optional[str]:
+        answered = self.answered_turns
+        return answered[0].user_question.strip() if answered else None
+
+
+_CONTEXT_SQL = """
+    SELECT user_question, ai_answer, intent,
+           (SELECT last_intent FROM conversations
+             WHERE conversation_id = :conv_id {user_filter}) AS last_intent
+    FROM conversation_messages
+    WHERE conversation_id = :conv_id {user_filter}
+    ORDER BY created_at DESC, message_id DESC
+    LIMIT :limit
+"""
+
+
+async def load_conversation_context(
+    db: AsyncSession,
+    conversation_id: Optional[str],
+    user_id: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> ConversationContext:
+    """Fetch the latest ``limit`` turns and the last intent in one round-trip.
+
+    The turns are an index range scan on (conversation_id, created_at) and the
+    last intent a primary-key lookup in the conversations summary, so the cost
+    does not grow with conversation length.
+    """
+    ctx = ConversationContext(conversation_id=conversation_id)
+    if not conversation_id:
+        return ctx
+
+    params = {"conv_id": conversation_id, "limit": limit or settings.CHAT_HISTORY_TURNS}
+    user_filter = ""
+    if user_id:
+        user_filter = "AND user_id = :user_id"
+        params["user_id"] = user_id
+
+    rows = (await db.execute(text(_CONTEXT_SQL.format(user_filter=user_filter)), params)).fetchall()
+    # Rows arrive newest first; keep turns in chronological order
+    ctx.turns = [ConversationTurn(user_question=r[0], ai_answer=r[1], intent=r[2]) for r in reversed(rows)]
+    if rows:
+        ctx.last_intent = rows[0][3]
+    return ctx
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import logging
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.cache import TTLCache
+from ..core.config import settings
+from ..models.models import ConversationState
+
+
+logger = logging.getLogger("scooby.conversation_state")
+
+
+@dataclass
+class FlowState:
+    """Active structured flow of a conversation.
+
+    ``awaiting`` names the slot the assistant asked for last, so the next user
+    message is read as the answer to that question and nothing else.
+
+    ``flow_id`` identifies one run of a flow (a new one per ``start``). After a
+    successful submission ``finish`` keeps it with no active flow, which marks
+    the run that was just submitted.
+    """
+
+    conversation_id: Optional[str]
+    user_id: Optional[str] = None
+    flow: Optional[str] = None
+    awaiting: Optional[str] = None
+    slots: Dict[str, Any] = field(default_factory=dict)
+    flow_id: Optional[str] = None
+
+    def start(self, flow: str) -> None:
+        self.flow = flow
+        self.awaiting = None
+        self.slots = {}
+        self.flow_id = uuid.uuid4().hex
+
+    def finish(self) -> None:
+        self.flow = None
+        self.awaiting = None
+        self.slots = {}
+
+    def reset(self) -> None:
+        self.finish()
+        self.flow_id = None
+
+
+class ConversationStateStore:
+    """Flow state keyed by conversation_id: an in-process LRU in front of conversation_state."""
+
+    def __init__(self, maxsize: int | None = None, ttl: float | None = None) -> None:
+        self._cache: TTLCache[FlowState] = TTLCache(maxsize or settings.CHAT_STATE_CACHE_SIZE)
+        self.ttl = ttl or settings.CHAT_STATE_CACHE_TTL
+
+    async def get(self, db: AsyncSession, conversation_id: Optional[str], user_id: Optional[str] = None) -> FlowState:
+        if not conversation_id:
+            return FlowState(conversation_id=None, user_id=user_id)
+        entry = self._cache.get(conversation_id)
+        if entry is not None:
+            return _copy(entry.value)
+
+        row = (
+            await db.execute(select(ConversationState).where(ConversationState.conversation_id == conversation_id))
+        ).scalars().first()
+        if row is None:
+            state = FlowState(conversation_id=conversation_id, user_id=user_id)
+        else:
+            state = FlowState(
+                conversation_id=conversation_id,
+                user_id=row.user_id or user_id,
+                flow=row.flow,
+                awaiting=row.awaiting,
+                slots=dict(row.slots or {}),
+                flow_id=row.flow_id,
+            )
+        self._cache.set(conversation_id, _copy(state), ttl=self.ttl)
+        return state
+
+    async def save(self, db: AsyncSession, state: FlowState) -> None:
+        if not state.conversation_id:
+            return
+        values = {
+            "conversation_id": state.conversation_id,
+            "user_id": state.user_id,
+            "flow": state.flow,
+            "awaiting": state.awaiting,
+            "slots": state.slots,
+            "flow_id": state.flow_id,
+        }
+        stmt = insert(ConversationState).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ConversationState.conversation_id],
+            set_={
+                "flow": stmt.excluded.flow,
+                "awaiting": stmt.excluded.awaiting,
+                "slots": stmt.excluded.slots,
+                "flow_id": stmt.excluded.flow_id,
+                "user_id": func.coalesce(stmt.excluded.user_id, ConversationState.user_id),
+                "updated_at": func.now(),
+            },
+        )
+        try:
+            await db.execute(stmt)
+            await db.commit()
+        except Exception as e:  # noqa: BLE001
+            await db.rollback()
+            logger.warning("[ConversationState] Failed to save state for %s: %s", state.conversation_id, e)
+        # The cache stays authoritative for this process even if the write failed
+        self._cache.set(state.conversation_id, _copy(state), ttl=self.ttl)
+
+
+def _copy(state: FlowState) -> FlowState:
+    return FlowState(
+        conversation_id=state.conversation_id,
+        user_id=state.user_id,
+        flow=state.flow,
+        awaiting=state.awaiting,
+        slots=dict(state.slots),
+        flow_id=state.flow_id,
+    )
+
+
+conversation_states = ConversationStateStore()
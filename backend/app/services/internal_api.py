@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+import aiohttp
+
+from ..core.cache import TTLCache
+from ..core.config import settings
+from ..core.http import create_client_session
+from ..core.resilience import backoff_delay
+
+logger = logging.getLogger("scooby.internal_api")
+
+# Statuses worth retrying for idempotent requests (frontend restarting or overloaded)
+_RETRY_STATUSES = frozenset({502, 503, 504})
+
+
+@dataclass
+class InternalApiResponse:
+    status: int
+    data: Any = None
+    text: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return self.status == 200
+
+
+def create_internal_api_session() -> aiohttp.ClientSession:
+    """Create the process-wide keep-alive session used by InternalApiClient."""
+    return create_client_session(
+        limit=settings.FE_HTTP_LIMIT,
+        limit_per_host=settings.FE_HTTP_LIMIT,
+        dns_ttl=settings.FE_HTTP_DNS_TTL,
+        keepalive_timeout=settings.FE_HTTP_KEEPALIVE_TIMEOUT,
+        total_timeout=max(settings.FE_TIMEOUT_POOL_CREATE, settings.FE_TIMEOUT_POOLS, settings.FE_TIMEOUT_INVEST),
+        connect_timeout=settings.FE_HTTP_CONNECT_TIMEOUT,
+        headers={"x-internal-call": "true"},
+    )
+
+
+class InternalApiClient:
+    """Client for the Next.js pool routes the chat calls server-to-server.
+
+    Every route has its own total timeout so a hung frontend fails the chat turn
+    instead of pinning it. Only the pools listing (a GET) is retried on network
+    errors, timeouts and 502/503/504; pool creation and investments are sent
+    once, since a retry after a lost response could submit them twice.
+    Non-200 answers are returned, not raised; transport errors are raised.
+
+    Pool listings are cached per collection address for FE_POOLS_CACHE_TTL
+    seconds. A pool created or an investment submitted through this client drops
+    the listing of its collection, so the next read sees the change. Investments
+    only carry a pool id; its collection is known from earlier listings, and when
+    it is not every cached listing is dropped.
+    """
+
+    def __init__(self, session: aiohttp.ClientSession | None = None, base_url: str | None = None) -> None:
+        self.base_url = (base_url or settings.FE_BASE_URL).rstrip("/")
+        # Shared session injected by the app lifespan; None means one-off sessions
+        self._session = session
+        self._metrics: Dict[str, Dict[str, float]] = {}
+        self.pools_cache: TTLCache[Any] = TTLCache(settings.FE_POOLS_CACHE_SIZE)
+        # pool id -> collection address, learned from listings (a pool never moves)
+        self._pool_collections: TTLCache[str] = TTLCache(settings.FE_POOLS_CACHE_SIZE * 16)
+        self.cache_counters: Dict[str, int] = {"hits": 0, "misses": 0, "invalidations": 0, "flushes": 0}
+
+    async def create_pool(self, payload: Dict[str, Any], idempotency_key: Optional[str] = None) -> InternalApiResponse:
+        resp = await self._call(
+            "pool_create",
+            "POST",
+            "/api/pool/create",
+            settings.FE_TIMEOUT_POOL_CREATE,
+            json=payload,
+            idempotency_key=idempotency_key,
+        )
+        if resp.ok:
+            self.invalidate_pools(payload.get("nftCollectionAddress"))
+        return resp
+
+    async def get_pools_by_collection(self, address: str) -> InternalApiResponse:
+        key = address.strip().lower()
+        entry = self.pools_cache.get(key)
+        if entry is not None and entry.is_fresh(time.monotonic()):
+            self.cache_counters["hits"] += 1
+            return InternalApiResponse(status=200, data=entry.value)
+        self.cache_counters["misses"] += 1
+        resp = await self._call(
+            "pools_by_collection",
+            "GET",
+            f"/api/pools/collection/{address}",
+            settings.FE_TIMEOUT_POOLS,
+            retries=settings.FE_RETRY_ATTEMPTS,
+        )
+        if resp.ok:
+            self.pools_cache.set(key, resp.data, ttl=settings.FE_POOLS_CACHE_TTL)
+            pools = resp.data.get("pools") if isinstance(resp.data, dict) else None
+            for pool in pools if isinstance(pools, list) else []:
+                if isinstance(pool, dict) and pool.get("id") is not None:
+                    self._pool_collections.set(str(pool["id"]), key, ttl=math.inf)
+        return resp
+
+    async def invest(self, payload: Dict[str, Any], idempotency_key: Optional[str] = None) -> InternalApiResponse:
+        resp = await self._call(
+            "pool_invest",
+            "POST",
+            "/api/pool/invest",
+            settings.FE_TIMEOUT_INVEST,
+            json=payload,
+            idempotency_key=idempotency_key,
+        )
+        if resp.ok:
+            entry = self._pool_collections.get(str(payload.get("poolId")))
+            if entry is not None:
+                self.invalidate_pools(entry.value)
+            else:
+                self.cache_counters["flushes"] += 1
+                self.pools_cache.clear()
+        return resp
+
+    def invalidate_pools(self, address: Optional[str]) -> None:
+        if address and self.pools_cache.pop(address.strip().lower()) is not None:
+            self.cache_counters["invalidations"] += 1
+
+    async def _call(
+        self,
+        route: str,
+        method: str,
+        path: str,
+        timeout: float,
+        json: Optional[Dict[str, Any]] = None,
+        retries: int = 0,
+        idempotency_key: Optional[str] = None,
+    ) -> InternalApiResponse:
+        # Lets the frontend drop a submission it has already processed
+        headers = {"Idempotency-Key": idempotency_key} if idempotency_key else None
+        if self._session is None or self._session.closed:
+            async with create_internal_api_session() as session:
+                return await self._send(session, route, method, path, timeout, json, retries, headers)
+        return await self._send(self._session, route, method, path, timeout, json, retries, headers)
+
+    async def _send(
+        self,
+        session: aiohttp.ClientSession,
+        route: str,
+        method: str,
+        path: str,
+        timeout: float,
+        json: Optional[Dict[str, Any]],
+        retries: int,
+        headers: Optional[Dict[str, str]],
+    ) -> InternalApiResponse:
+        url = f"{self.base_url}{path}"
+        metrics = self._metrics.setdefault(
+            route, {"requests": 0, "errors": 0, "timeouts": 0, "retries": 0, "total_ms": 0.0, "max_ms": 0.0}
+        )
+        client_timeout = aiohttp.ClientTimeout(total=timeout, sock_connect=settings.FE_HTTP_CONNECT_TIMEOUT)
+        attempt = 0
+        while True:
+            metrics["requests"] += 1
+            started = time.perf_counter()
+            error: Exception | None = None
+            try:
+                async with session.request(method, url, json=json, headers=headers, timeout=client_timeout) as resp:
+                    if resp.status == 200:
+                        result = InternalApiResponse(status=resp.status, data=await resp.json(content_type=None))
+                    else:
+                        result = InternalApiResponse(status=resp.status, text=await resp.text())
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = e
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            metrics["total_ms"] += elapsed_ms
+            metrics["max_ms"] = max(metrics["max_ms"], elapsed_ms)
+
+            if error is None and result.status not in _RETRY_STATUSES:
+                if not result.ok:
+                    metrics["errors"] += 1
+                logger.info("[InternalAPI] %s %s -> %d in %.0fms", method, path, result.status, elapsed_ms)
+                return result
+            if isinstance(error, asyncio.TimeoutError):
+                metrics["timeouts"] += 1
+            metrics["errors"] += 1
+            attempt += 1
+            reason = f"{type(error).__name__} {error}".strip() if error is not None else f"status {result.status}"
+            if attempt > retries:
+                logger.warning("[InternalAPI] %s %s failed after %d attempt(s): %s", method, path, attempt, reason)
+                if isinstance(error, asyncio.TimeoutError):
+                    raise asyncio.TimeoutError(f"frontend did not answer within {timeout:g}s") from error
+                if error is not None:
+                    raise error
+                return result
+            metrics["retries"] += 1
+            delay = backoff_delay(attempt, settings.FE_RETRY_BASE_DELAY, settings.FE_RETRY_MAX_DELAY)
+            logger.info("[InternalAPI] Retrying %s %s in %.2fs: %s", method, path, delay, reason)
+            await asyncio.sleep(delay)
+
+    def stats(self) -> Dict[str, Any]:
+        routes = {
+            route: {
+                "requests": int(m["requests"]),
+                "errors": int(m["errors"]),
+                "timeouts": int(m["timeouts"]),
+                "retries": int(m["retries"]),
+                "avg_ms": round(m["total_ms"] / m["requests"], 2) if m["requests"] else 0.0,
+                "max_ms": round(m["max_ms"], 2),
+            }
+            for route, m in self._metrics.items()
+        }
+        return {"routes": routes, "pools_cache": {**self.cache_counters, **self.pools_cache.stats()}}
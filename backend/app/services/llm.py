@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Callable
+
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+from ..core.config import settings
+
+
+_client: AsyncOpenAI | None = None
+
+
+def get_openai_client(api_key: str | None = None) -> AsyncOpenAI | None:
+    """Return the process-wide AsyncOpenAI client, or None if no key is configured.
+
+    All LLM services share this client so their requests multiplex over one
+    keep-alive connection pool instead of blocking the event loop.
+    """
+    global _client
+    default_key = getattr(settings, "OPENAI_API_KEY", None) or getattr(settings, "openai_api_key", None)
+    key = api_key or default_key
+    if not key:
+        return None
+    if key != default_key:
+        # Explicit non-default key: give the caller its own client
+        return _build_client(key)
+    if _client is None:
+        _client = _build_client(key)
+    return _client
+
+
+def _build_client(key: str) -> AsyncOpenAI:
+    http_client = DefaultAsyncHttpxClient(
+        limits=httpx.Limits(
+            max_connections=settings.OPENAI_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+        ),
+    )
+    return AsyncOpenAI(
+        api_key=key,
+        timeout=settings.OPENAI_TIMEOUT,
+        max_retries=settings.OPENAI_MAX_RETRIES,
+        http_client=http_client,
+    )
+
+
+async def close_openai_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
+
+
+TokenCallback = Callable[[str], Awaitable[None]]
+
+
+async def _discard_token(_: str) -> None:
+    return None
+
+
+async def complete_chat(
+    client: AsyncOpenAI,
+    *,
+    on_token: TokenCallback | None = None,
+    timeout: float | None = None,
+    **kwargs: Any,
+) -> str:
+    """Run a chat completion and return its text.
+
+    When ``on_token`` is given the completion is streamed and every content delta
+    is forwarded to it as it arrives; the full text is still returned at the end.
+
+    ``timeout`` bounds the wait for the first content delta, one deadline shared
+    by the request and that wait; a long reply that is already flowing is not cut
+    off. Expiry raises ``asyncio.TimeoutError``. A bounded call without
+    ``on_token`` is streamed internally for the same reason.
+    """
+    if on_token is None:
+        if timeout is None:
+            resp = await client.chat.completions.create(**kwargs)
+            return resp.choices[0].message.content or ""
+        on_token = _discard_token
+
+    loop = asyncio.get_running_loop()
+    deadline = None if timeout is None else loop.time() + timeout
+
+    def remaining() -> float | None:
+        return None if deadline is None else max(0.0, deadline - loop.time())
+
+    stream = await asyncio.wait_for(client.chat.completions.create(stream=True, **kwargs), timeout)
+    chunks = stream.__aiter__()
+    parts: list[str] = []
+    try:
+        while True:
+            try:
+                # Only the wait for the first delta is bounded, by what is left of the deadline
+                chunk = await (chunks.__anext__() if parts else asyncio.wait_for(chunks.__anext__(), remaining()))
+            except StopAsyncIteration:
+                break
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                parts.append(delta)
+                await on_token(delta)
+    except BaseException:
+        # Release the connection of an abandoned stream
+        await stream.close()
+        raise
+    return "".join(parts)
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import hashlib
+import re
+from typing import Any, Dict, Optional, Sequence
+
+from ..core.cache import TTLCache
+from ..core.config import settings
+
+
+_WS_RE = re.compile(r"\s+")
+_TRAILING_PUNCT_RE = re.compile(r"[\s\?\!\.\,;:]+$")
+
+
+def normalize_query(text: str) -> str:
+    """Case-fold, unify quotes, collapse whitespace and drop trailing punctuation."""
+    t = text.strip().lower().replace("’", "'").replace("‘", "'")
+    t = _WS_RE.sub(" ", t)
+    return _TRAILING_PUNCT_RE.sub("", t)
+
+
+def prompt_version(*parts: Any) -> str:
+    """Short fingerprint of a prompt and its call parameters; changes invalidate cached results."""
+    return hashlib.sha1("\x1f".join(str(p) for p in parts).encode("utf-8")).hexdigest()[:12]
+
+
+class LLMResultCache:
+    """Bounded LRU/TTL cache of LLM outputs keyed on (prompt version, normalized query, history).
+
+    ``history`` must be exactly what the prompt includes: two calls only share
+    a result when the model would have seen the same context.
+    """
+
+    def __init__(self, name: str, maxsize: int | None = None, ttl: float | None = None) -> None:
+        self.name = name
+        self._store: TTLCache[str] = TTLCache(maxsize or settings.LLM_CACHE_SIZE)
+        self.ttl = ttl or settings.LLM_CACHE_TTL
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(version: str, message: str, history: Sequence[str] | None = None) -> str:
+        h = hashlib.sha1()
+        h.update(version.encode("utf-8"))
+        h.update(b"\x00")
+        h.update(normalize_query(message).encode("utf-8"))
+        for pair in history or []:
+            h.update(b"\x00")
+            h.update(pair.encode("utf-8"))
+        return h.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self._store.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry.value
+
+    def set(self, key: str, value: str) -> None:
+        self._store.set(key, value, ttl=self.ttl)
+
+    def clear(self) -> None:
+        self._store.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            **self._store.stats(),
+        }
+
+
+rewrite_cache = LLMResultCache("rewrite")
+intent_cache = LLMResultCache("intent")
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import json
+import logging
+import math
+import os
+import random
+import re
+import zlib
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from ..core.config import settings
+
+
+logger = logging.getLogger("scooby.local_intent_model")
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def _hashed_features(text: str, dim: int) -> Dict[int, float]:
+    """Word uni/bigrams and character trigrams hashed into ``dim`` buckets, L2-normalised.
+
+    crc32 is used instead of hash() so buckets are stable across processes.
+    """
+    words = _TOKEN_RE.findall(text.lower())
+    grams: List[str] = [f"w:{w}" for w in words]
+    grams += [f"b:{a}_{b}" for a, b in zip(words, words[1:])]
+    for w in words:
+        padded = f" {w} "
+        grams += [f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2)]
+
+    feats: Dict[int, float] = {}
+    for g in grams:
+        idx = zlib.crc32(g.encode("utf-8")) % dim
+        feats[idx] = feats.get(idx, 0.0) + 1.0
+    norm = math.sqrt(sum(v * v for v in feats.values())) or 1.0
+    return {k: v / norm for k, v in feats.items()}
+
+
+class LocalIntentModel:
+    """Multinomial logistic regression over hashed n-gram features.
+
+    Small enough to keep in memory and answer in microseconds; meant to handle the
+    confident bulk of messages before falling back to the LLM classifier.
+    """
+
+    def __init__(self, labels: Sequence[str], dim: int = 1 << 18) -> None:
+        self.labels = list(labels)
+        self.dim = dim
+        self.weights: List[Dict[int, float]] = [dict() for _ in self.labels]
+        self.bias: List[float] = [0.0 for _ in self.labels]
+
+    def predict_proba(self, text: str) -> Dict[str, float]:
+        feats = _hashed_features(text, self.dim)
+        return dict(zip(self.labels, self._softmax(feats)))
+
+    def predict(self, text: str) -> Tuple[str, float]:
+        probs = self._softmax(_hashed_features(text, self.dim))
+        best = max(range(len(probs)), key=probs.__getitem__)
+        return self.labels[best], probs[best]
+
+    def _softmax(self, feats: Dict[int, float]) -> List[float]:
+        scores = [
+            b + sum(w.get(i, 0.0) * v for i, v in feats.items())
+            for w, b in zip(self.weights, self.bias)
+        ]
+        top = max(scores)
+        exps = [math.exp(s - top) for s in scores]
+        total = sum(exps)
+        return [e / total for e in exps]
+
+    @classmethod
+    def train(
+        cls,
+        samples: Sequence[Tuple[str, str]],
+        *,
+        epochs: int = 15,
+        learning_rate: float = 0.5,
+        l2: float = 1e-6,
+        dim: int = 1 << 18,
+        seed: int = 13,
+    ) -> "LocalIntentModel":
+        labels = sorted({label for _, label in samples})
+        model = cls(labels, dim=dim)
+        index = {label: i for i, label in enumerate(labels)}
+        data = [(_hashed_features(text, dim), index[label]) for text, label in samples]
+        rng = random.Random(seed)
+        for epoch in range(epochs):
+            rng.shuffle(data)
+            lr = learning_rate / (1.0 + epoch)
+            for feats, y in data:
+                probs = model._softmax(feats)
+                for k, p in enumerate(probs):
+                    grad = p - (1.0 if k == y else 0.0)
+                    if abs(grad) < 1e-6:
+                        continue
+                    w = model.weights[k]
+                    for i, v in feats.items():
+                        w[i] = w.get(i, 0.0) * (1.0 - lr * l2) - lr * grad * v
+                    model.bias[k] -= lr * grad
+        model._prune()
+        return model
+
+    def _prune(self, eps: float = 1e-4) -> None:
+        self.weights = [{i: v for i, v in w.items() if abs(v) >= eps} for w in self.weights]
+
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        payload = {
+            "version": 1,
+            "dim": self.dim,
+            "labels": self.labels,
+            "bias": self.bias,
+            "weights": [{str(i): round(v, 6) for i, v in w.items()} for w in self.weights],
+        }
+        with open(path, "w") as f:
+            json.dump(payload, f)
+
+    @classmethod
+    def load(cls, path: str) -> "LocalIntentModel":
+        with open(path, "r") as f:
+            payload = json.load(f)
+        model = cls(payload["labels"], dim=int(payload["dim"]))
+        model.bias = [float(b) for b in payload["bias"]]
+        model.weights = [{int(i): float(v) for i, v in w.items()} for w in payload["weights"]]
+        return model
+
+
+def evaluate(model: LocalIntentModel, samples: Iterable[Tuple[str, str]], threshold: float) -> Dict[str, float]:
+    """Accuracy overall, plus coverage and accuracy of the predictions above ``threshold``."""
+    total = correct = confident = confident_correct = 0
+    for text, label in samples:
+        pred, conf = model.predict(text)
+        total += 1
+        correct += pred == label
+        if conf >= threshold:
+            confident += 1
+            confident_correct += pred == label
+    return {
+        "samples": total,
+        "accuracy": correct / total if total else 0.0,
+        "coverage": confident / total if total else 0.0,
+        "confident_accuracy": confident_correct / confident if confident else 0.0,
+    }
+
+
+_model: Optional[LocalIntentModel] = None
+
+
+def load_local_intent_model(path: str | None = None) -> Optional[LocalIntentModel]:
+    """Load the trained model at startup. A missing file just disables the fast path."""
+    global _model
+    path = path or settings.INTENT_MODEL_PATH
+    if not path or not os.path.exists(path):
+        logger.info("[LocalIntentModel] No model at %r; LLM classifier only", path)
+        _model = None
+        return None
+    try:
+        _model = LocalIntentModel.load(path)
+        logger.info("[LocalIntentModel] Loaded %d labels from %s", len(_model.labels), path)
+    except Exception as e:  # noqa: BLE001
+        logger.warning("[LocalIntentModel] Failed to load %s: %s", path, e)
+        _model = None
+    return _model
+
+
+def get_local_intent_model() -> Optional[LocalIntentModel]:
+    return _model
@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, insert
+from sqlalchemy.exc import InterfaceError, OperationalError
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from ..core.config import settings
+from ..core.database import AsyncSessionLocal
+from ..models.models import Conversation, ConversationMessage
+
+
+logger = logging.getLogger("scooby.message_writer")
+
+_Item = Tuple[Dict[str, Any], Optional["asyncio.Future[None]"]]
+
+
+class MessageWriteError(RuntimeError):
+    """Raised to a waiting caller whose message could not be written."""
+
+
+class MessageWriter:
+    """Write-behind queue that batches ConversationMessage rows into multi-row INSERTs.
+
+    Each batch also upserts the per-conversation summaries in the same transaction.
+
+    A batch is flushed when it reaches ``batch_size`` rows or ``flush_interval``
+    seconds after its first row, whichever comes first. In "sync" mode callers
+    wait until their row is committed (MessageWriteError if it was not); in
+    "async" mode they return immediately and the queue is drained on shutdown.
+    When a batch fails, its rows are retried one by one so only the offending
+    rows are lost.
+    """
+
+    def __init__(
+        self,
+        mode: str | None = None,
+        batch_size: int | None = None,
+        flush_interval: float | None = None,
+        max_queue: int | None = None,
+    ) -> None:
+        self.mode = mode or settings.CHAT_PERSIST_MODE
+        self.batch_size = batch_size or settings.CHAT_PERSIST_BATCH_SIZE
+        self.flush_interval = settings.CHAT_PERSIST_FLUSH_INTERVAL if flush_interval is None else flush_interval
+        self._max_queue = max_queue or settings.CHAT_PERSIST_QUEUE_SIZE
+        self._queue: asyncio.Queue[_Item | None] | None = None
+        self._task: asyncio.Task[None] | None = None
+        self.counters: Dict[str, int] = {"rows_written": 0, "rows_failed": 0, "batches": 0}
+        self._flush_ms_total = 0.0
+        self._flush_ms_max = 0.0
+        self._flush_ms_last = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self._max_queue)
+        self._task = asyncio.create_task(self._run())
+        logger.info("[MessageWriter] Started (mode=%s, batch=%d, interval=%.3fs)", self.mode, self.batch_size, self.flush_interval)
+
+    async def stop(self) -> None:
+        """Flush everything still queued, then stop the worker."""
+        if not self.running or self._queue is None:
+            return
+        await self._queue.put(None)
+        await self._task  # type: ignore[misc]
+        self._task = None
+        logger.info("[MessageWriter] Drained and stopped")
+
+    async def submit(self, row: Dict[str, Any], wait: Optional[bool] = None) -> None:
+        """Queue one row. ``wait`` overrides the configured durability mode."""
+        if wait is None:
+            wait = self.mode == "sync"
+        if not self.running or self._queue is None:
+            # No worker (scripts, tests): write inline
+            if not (await self._flush([(row, None)]))[0] and wait:
+                raise MessageWriteError("conversation message was not persisted")
+            return
+        fut: Optional[asyncio.Future[None]] = asyncio.get_running_loop().create_future() if wait else None
+        # Bounded queue: applies backpressure instead of growing without limit
+        await self._queue.put((row, fut))
+        if fut is not None:
+            await fut
+
+    async def _run(self) -> None:
+        assert self._queue is not None
+        queue = self._queue
+        stopping = False
+        while not stopping:
+            first = await queue.get()
+            if first is None:
+                break
+            batch: List[_Item] = [first]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                try:
+                    item = queue.get_nowait() if timeout <= 0 else await asyncio.wait_for(queue.get(), timeout)
+                except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._flush(batch)
+        # Drain anything enqueued behind the stop marker
+        rest: List[_Item] = []
+        while not queue.empty():
+            item = queue.get_nowait()
+            if item is not None:
+                rest.append(item)
+        for i in range(0, len(rest), self.batch_size):
+            await self._flush(rest[i:i + self.batch_size])
+
+    async def _flush(self, batch: List[_Item]) -> List[bool]:
+        """Write a batch; returns, per row, whether it was committed."""
+        rows = [row for row, _ in batch]
+        written = [False] * len(rows)
+        started = time.perf_counter()
+        try:
+            written = await self._write_batch(rows)
+        except Exception as e:  # noqa: BLE001
+            # Persistence is best-effort, as before: never fail the chat reply
+            logger.warning("[MessageWriter] Failed to write %d rows: %s", len(rows), e)
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self.counters["batches"] += 1
+            self.counters["rows_written"] += sum(written)
+            self.counters["rows_failed"] += len(rows) - sum(written)
+            self._flush_ms_last = elapsed_ms
+            self._flush_ms_total += elapsed_ms
+            self._flush_ms_max = max(self._flush_ms_max, elapsed_ms)
+            for (_, fut), ok in zip(batch, written):
+                if fut is None or fut.done():
+                    continue
+                if ok:
+                    fut.set_result(None)
+                else:
+                    fut.set_exception(MessageWriteError("conversation message was not persisted"))
+        return written
+
+    async def _write_batch(self, rows: List[Dict[str, Any]]) -> List[bool]:
+        try:
+            async with AsyncSessionLocal() as db:
+                await _insert_rows(db, rows)
+                await db.commit()
+            return [True] * len(rows)
+        except (OperationalError, InterfaceError):
+            # The database is unreachable: every row would fail again
+            raise
+        except Exception as e:  # noqa: BLE001
+            if len(rows) == 1:
+                raise
+            logger.warning("[MessageWriter] Batch of %d rows failed, retrying row by row: %s", len(rows), e)
+        # One savepoint per row, so a bad row (e.g. an unknown user_id) only loses itself
+        written: List[bool] = []
+        async with AsyncSessionLocal() as db:
+            for row in rows:
+                try:
+                    async with db.begin_nested():
+                        await _insert_rows(db, [row])
+                    written.append(True)
+                except Exception as e:  # noqa: BLE001
+                    logger.warning("[MessageWriter] Dropped message for conversation %r: %s", row.get("conversation_id"), e)
+                    written.append(False)
+            await db.commit()
+        return written
+
+    def stats(self) -> Dict[str, Any]:
+        batches = self.counters["batches"]
+        return {
+            **self.counters,
+            "mode": self.mode,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "flush_ms_last": round(self._flush_ms_last, 2),
+            "flush_ms_avg": round(self._flush_ms_total / batches, 2) if batches else 0.0,
+            "flush_ms_max": round(self._flush_ms_max, 2),
+        }
+
+
+async def _insert_rows(db: Any, rows: List[Dict[str, Any]]) -> None:
+    """Insert messages and upsert their conversation summaries (caller commits)."""
+    # executemany with RETURNING is still sent as multi-row INSERTs
+    # ("insertmanyvalues"); sort_by_parameter_order keeps results aligned with rows
+    result = await db.execute(
+        insert(ConversationMessage).returning(
+            ConversationMessage.message_id,
+            ConversationMessage.created_at,
+            sort_by_parameter_order=True,
+        ),
+        rows,
+    )
+    summaries = _conversation_summaries(rows, result.all())
+    if summaries:
+        await db.execute(_upsert_conversations(summaries))
+
+
+def _conversation_summaries(rows: List[Dict[str, Any]], inserted: List[Any]) -> List[Dict[str, Any]]:
+    """Fold a batch into one summary row per conversation (a multi-row upsert may
+    touch each conversation only once)."""
+    summaries: Dict[str, Dict[str, Any]] = {}
+    for row, (message_id, created_at) in zip(rows, inserted):
+        conversation_id = row.get("conversation_id")
+        if not conversation_id:
+            continue
+        summary = summaries.get(conversation_id)
+        if summary is None:
+            summary = summaries[conversation_id] = {
+                "conversation_id": conversation_id,
+                "user_id": None,
+                "message_count": 0,
+                "last_intent": None,
+            }
+        summary["message_count"] += 1
+        summary["user_id"] = row.get("user_id") or summary["user_id"]
+        summary["last_intent"] = row.get("intent") or summary["last_intent"]
+        summary["last_message_at"] = created_at
+        summary["last_message_id"] = message_id
+        summary["preview"] = (row.get("user_question") or "")[:80]
+    # Stable lock order across concurrent writers
+    return [summaries[k] for k in sorted(summaries)]
+
+
+def _upsert_conversations(summaries: List[Dict[str, Any]]) -> Any:
+    stmt = pg_insert(Conversation).values(summaries)
+    excluded = stmt.excluded
+    return stmt.on_conflict_do_update(
+        index_elements=[Conversation.conversation_id],
+        set_={
+            "user_id": func.coalesce(excluded.user_id, Conversation.user_id),
+            "last_message_at": func.greatest(Conversation.last_message_at, excluded.last_message_at),
+            "last_message_id": func.greatest(Conversation.last_message_id, excluded.last_message_id),
+            "preview": excluded.preview,
+            "message_count": Conversation.message_count + excluded.message_count,
+            "last_intent": func.coalesce(excluded.last_intent, Conversation.last_intent),
+        },
+    )
+
+
+message_writer = MessageWriter()
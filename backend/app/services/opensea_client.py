@@ -1,18 +1,217 @@
 from __future__ import annotations
 
+import asyncio
 import aiohttp
 import logging
-from typing import Any, Dict, Optional
+import re
+import time
+from collections import Counter
+from contextlib import aclosing, contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, Iterator, List, Optional, Tuple
 
+from ..core.cache import TTLCache
 from ..core.config import settings
+from ..core.http import create_client_session
+from ..core.resilience import (
+    AdaptiveConcurrencyLimiter,
+    CircuitBreaker,
+    TokenBucket,
+    backoff_delay,
+    parse_retry_after,
+)
 
 logger = logging.getLogger("scooby.opensea")
 
+# Set by the prefetcher: cached calls in this context reload instead of reading
+_force_refresh: ContextVar[bool] = ContextVar("opensea_force_refresh", default=False)
+
+
+@contextmanager
+def force_refresh() -> Iterator[None]:
+    """Make OpenSeaClient calls inside the block refresh their cache entries."""
+    token = _force_refresh.set(True)
+    try:
+        yield
+    finally:
+        _force_refresh.reset(token)
+
+
+def _default_ttls() -> Dict[str, float]:
+    return {
+        "trending": settings.OPENSEA_CACHE_TTL_TRENDING,
+        "volume": settings.OPENSEA_CACHE_TTL_VOLUME,
+        "collections": settings.OPENSEA_CACHE_TTL_COLLECTIONS,
+        "collection": settings.OPENSEA_CACHE_TTL_COLLECTION,
+        "stats": settings.OPENSEA_CACHE_TTL_STATS,
+    }
+
+
+class OpenSeaCache:
+    """Stale-while-revalidate response cache with single-flight loading.
+
+    Fresh entries are returned directly. Entries inside the stale window are
+    returned immediately while one background task refreshes them. Concurrent
+    misses for the same key share one upstream call.
+    """
+
+    def __init__(
+        self,
+        maxsize: int | None = None,
+        ttls: Dict[str, float] | None = None,
+        stale_ttl: float | None = None,
+    ) -> None:
+        self._store: TTLCache[Any] = TTLCache(maxsize or settings.OPENSEA_CACHE_MAXSIZE)
+        self.ttls = ttls or _default_ttls()
+        self.stale_ttl = settings.OPENSEA_CACHE_STALE_TTL if stale_ttl is None else stale_ttl
+        self._inflight: Dict[Hashable, asyncio.Task[Any]] = {}
+        self.counters: Dict[str, int] = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "refreshes": 0,
+            "errors": 0,
+        }
+
+    async def get_or_load(self, endpoint: str, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        entry = self._store.get(key)
+        if entry is not None:
+            if entry.is_fresh(time.monotonic()):
+                self.counters["hits"] += 1
+                return entry.value
+            self.counters["stale_hits"] += 1
+            if key not in self._inflight:
+                self.counters["refreshes"] += 1
+                self._start_load(endpoint, key, loader)
+            return entry.value
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.counters["coalesced"] += 1
+        else:
+            self.counters["misses"] += 1
+            task = self._start_load(endpoint, key, loader)
+        # Shield so a cancelled caller does not abort the load other callers share
+        return await asyncio.shield(task)
+
+    async def refresh(self, endpoint: str, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Reload an entry now, fresh or not (used by the background prefetcher)."""
+        task = self._inflight.get(key)
+        if task is None:
+            self.counters["refreshes"] += 1
+            task = self._start_load(endpoint, key, loader)
+        return await asyncio.shield(task)
+
+    def _start_load(self, endpoint: str, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> asyncio.Task[Any]:
+        async def run() -> Any:
+            value = await loader()
+            self._store.set(key, value, ttl=self.ttls.get(endpoint, 60.0), stale_ttl=self.stale_ttl)
+            return value
+
+        task = asyncio.ensure_future(run())
+        self._inflight[key] = task
+        task.add_done_callback(lambda t: self._finish_load(key, t))
+        return task
+
+    def _finish_load(self, key: Hashable, task: asyncio.Task[Any]) -> None:
+        self._inflight.pop(key, None)
+        if task.cancelled():
+            return
+        exc = task.exception()
+        if exc is not None:
+            self.counters["errors"] += 1
+            logger.warning("[OpenSea] Cache load failed for %r: %s", key, exc)
+
+    def invalidate(self, key: Hashable) -> None:
+        self._store.pop(key)
+
+    def clear(self) -> None:
+        self._store.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.counters["hits"] + self.counters["stale_hits"] + self.counters["misses"] + self.counters["coalesced"]
+        served = self.counters["hits"] + self.counters["stale_hits"]
+        return {
+            **self.counters,
+            **self._store.stats(),
+            "inflight": len(self._inflight),
+            "hit_rate": round(served / lookups, 4) if lookups else 0.0,
+        }
+
+
+# Supported order_by fields for GET /collections per docs
+COLLECTIONS_ORDER_BY = frozenset({
+    "created_date",
+    "market_cap",
+    "num_owners",
+    "one_day_change",
+    "seven_day_change",
+    "seven_day_volume",
+})
+# Largest page OpenSea returns for GET /collections
+COLLECTIONS_PAGE_MAX = 100
+
+
+_COLLECTION_URL_RE = re.compile(r"(?:https?://)?(?:www\.)?opensea\.io/collection/([a-z0-9_\-]+)", re.I)
+_SLUG_RE = re.compile(r"^[a-z0-9][a-z0-9_\-]*$", re.I)
+
+
+def find_collection_slug(text: str) -> Optional[str]:
+    """Return the slug of the first OpenSea collection link in free text, if any."""
+    m = _COLLECTION_URL_RE.search(text or "")
+    return m.group(1).lower() if m else None
+
+
+def parse_collection_slug(value: str) -> Optional[str]:
+    """Parse one collection reference: an OpenSea collection link or a bare slug."""
+    value = (value or "").strip()
+    slug = find_collection_slug(value)
+    if slug:
+        return slug
+    return value.lower() if _SLUG_RE.match(value) else None
+
+
+class OpenSeaUnavailableError(RuntimeError):
+    """Raised without calling OpenSea while its circuit breaker is open."""
+
+
+def create_opensea_session() -> aiohttp.ClientSession:
+    """Create the process-wide keep-alive session used by OpenSeaClient."""
+    return create_client_session(
+        limit=settings.OPENSEA_HTTP_LIMIT,
+        limit_per_host=settings.OPENSEA_HTTP_LIMIT_PER_HOST,
+        dns_ttl=settings.OPENSEA_HTTP_DNS_TTL,
+        keepalive_timeout=settings.OPENSEA_HTTP_KEEPALIVE_TIMEOUT,
+        total_timeout=settings.OPENSEA_HTTP_TIMEOUT,
+        connect_timeout=settings.OPENSEA_HTTP_CONNECT_TIMEOUT,
+    )
+
 
 class OpenSeaClient:
-    def __init__(self, api_key: Optional[str] = None, base_url: str | None = None) -> None:
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: str | None = None,
+        session: aiohttp.ClientSession | None = None,
+        cache: OpenSeaCache | None = None,
+    ) -> None:
         self.base_url = base_url or settings.OPENSEA_BASE_URL
         self.api_key = api_key or settings.OPENSEA_API_KEY
+        # Shared session injected by the app lifespan; None means one-off sessions
+        self._session = session
+        # None disables caching (every call goes to OpenSea)
+        self.cache = cache
+        # Stats requests per slug, decayed by the prefetcher to rank recent demand
+        self.slug_demand: Counter[str] = Counter()
+        self.rate_limiter = TokenBucket(settings.OPENSEA_RATE_LIMIT, settings.OPENSEA_RATE_BURST)
+        self.concurrency = AdaptiveConcurrencyLimiter(
+            initial=settings.OPENSEA_HTTP_LIMIT_PER_HOST,
+            minimum=settings.OPENSEA_CONCURRENCY_MIN,
+            maximum=settings.OPENSEA_HTTP_LIMIT_PER_HOST,
+        )
+        self.breaker = CircuitBreaker(settings.OPENSEA_BREAKER_FAILURES, settings.OPENSEA_BREAKER_RESET)
+        self.counters: Dict[str, int] = {"requests": 0, "retries": 0, "throttled": 0, "failures": 0}
 
     def _headers(self) -> Dict[str, str]:
         headers: Dict[str, str] = {"accept": "application/json"}
@@ -23,13 +222,108 @@ class OpenSeaClient:
     async def _get(self, path: str, params: Dict[str, Any] | None = None) -> Dict[str, Any]:
         url = f"{self.base_url}{path}"
         logger.info("[OpenSea] GET %s | params: %r", url, params or {})
-        async with aiohttp.ClientSession(headers=self._headers()) as session:
-            async with session.get(url, params=params) as resp:
-                resp.raise_for_status()
-                data = await resp.json()
-                logger.info("[OpenSea] Response status: %d | data keys: %r", resp.status, list(data.keys()) if isinstance(data, dict) else "non-dict")
-                logger.info("[OpenSea] Response data: %r", data)
-                return data
+        if self._session is None or self._session.closed:
+            async with create_opensea_session() as session:
+                return await self._request(session, url, params)
+        return await self._request(self._session, url, params)
+
+    async def _cached_get(self, endpoint: str, path: str, params: Dict[str, Any] | None = None) -> Dict[str, Any]:
+        if self.cache is None:
+            return await self._get(path, params)
+        key = self.cache_key(endpoint, path, params)
+        if _force_refresh.get():
+            return await self.cache.refresh(endpoint, key, lambda: self._get(path, params))
+        return await self.cache.get_or_load(endpoint, key, lambda: self._get(path, params))
+
+    @staticmethod
+    def cache_key(endpoint: str, path: str, params: Dict[str, Any] | None = None) -> Tuple[Any, ...]:
+        return (endpoint, path, tuple(sorted((params or {}).items())))
+
+    def hot_slugs(self, n: int) -> List[str]:
+        return [slug for slug, _ in self.slug_demand.most_common(n)]
+
+    def decay_slug_demand(self, factor: float = 0.5) -> None:
+        """Age request counts so the ranking follows recent demand."""
+        for slug, count in list(self.slug_demand.items()):
+            decayed = int(count * factor)
+            if decayed:
+                self.slug_demand[slug] = decayed
+            else:
+                del self.slug_demand[slug]
+
+    def cache_stats(self) -> Dict[str, Any]:
+        return self.cache.stats() if self.cache is not None else {"enabled": False}
+
+    async def _request(self, session: aiohttp.ClientSession, url: str, params: Dict[str, Any] | None) -> Dict[str, Any]:
+        """GET with rate limiting, retries on 429/5xx/network errors and a circuit breaker.
+
+        Other 4xx responses are the caller's problem: raised at once and not
+        counted against OpenSea's health.
+        """
+        if not self.breaker.allow():
+            raise OpenSeaUnavailableError(f"OpenSea unavailable (circuit open, retry in {self.breaker.retry_in():.0f}s)")
+        probe = self.breaker.state == CircuitBreaker.HALF_OPEN
+        try:
+            return await self._request_with_retries(session, url, params)
+        except BaseException:
+            if probe:
+                # Outcomes already closed or reopened the circuit; this covers cancellation
+                self.breaker.release_probe()
+            raise
+
+    async def _request_with_retries(
+        self, session: aiohttp.ClientSession, url: str, params: Dict[str, Any] | None
+    ) -> Dict[str, Any]:
+        attempt = 0
+        while True:
+            await self.rate_limiter.acquire()
+            retry_after: float | None = None
+            self.counters["requests"] += 1
+            try:
+                async with self.concurrency:
+                    async with session.get(url, params=params, headers=self._headers()) as resp:
+                        if resp.status == 429:
+                            self.counters["throttled"] += 1
+                            self.concurrency.on_throttle()
+                        if resp.status == 429 or resp.status >= 500:
+                            retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+                        else:
+                            # OpenSea answered; a 404 or 400 says nothing about its health
+                            self.breaker.record_success()
+                        resp.raise_for_status()
+                        data = await resp.json()
+                        logger.info("[OpenSea] Response status: %d | data keys: %r", resp.status, list(data.keys()) if isinstance(data, dict) else "non-dict")
+                        logger.debug("[OpenSea] Response data: %r", data)
+                        self.concurrency.on_success()
+                        return data
+            except aiohttp.ClientResponseError as e:
+                if e.status != 429 and e.status < 500:
+                    raise
+                error: Exception = e
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = e
+
+            attempt += 1
+            delay = max(backoff_delay(attempt, settings.OPENSEA_RETRY_BASE_DELAY, settings.OPENSEA_RETRY_MAX_DELAY), retry_after or 0.0)
+            if retry_after:
+                # Hold every request, not just this one, until OpenSea accepts traffic again
+                self.rate_limiter.pause(retry_after)
+            if attempt > settings.OPENSEA_RETRY_ATTEMPTS or delay > settings.OPENSEA_RETRY_MAX_DELAY:
+                self.counters["failures"] += 1
+                self.breaker.record_failure()
+                logger.warning("[OpenSea] GET %s failed after %d attempt(s): %s", url, attempt, error)
+                raise error
+            self.counters["retries"] += 1
+            logger.info("[OpenSea] Retrying GET %s in %.2fs (attempt %d): %s", url, delay, attempt, error)
+            await asyncio.sleep(delay)
+
+    def upstream_stats(self) -> Dict[str, Any]:
+        return {
+            **self.counters,
+            "rate_limiter": self.rate_limiter.stats(),
+            "concurrency": self.concurrency.stats(),
+            "breaker": self.breaker.stats(),
+        }
 
     async def get_trending_collections(self, limit: int = 25, chain: str | None = None) -> Dict[str, Any]:
         # Use supported fields. For "trending" signal, one_day_change is available per docs.
@@ -40,7 +334,7 @@ class OpenSeaClient:
         }
         if chain:
             params["chain"] = chain
-        return await self._get("/collections", params)
+        return await self._collect_collections("trending", params, limit)
 
     async def get_collections_by_volume(self, days: int = 7, limit: int = 50, chain: str | None = None) -> Dict[str, Any]:
         # Per docs, supported order_by for volume is seven_day_volume.
@@ -52,7 +346,7 @@ class OpenSeaClient:
         if chain:
             params["chain"] = chain
 
-        data = await self._get("/collections", params)
+        data = await self._collect_collections("volume", params, limit)
         # Filter client-side using seven_day_volume as proxy for requested days threshold
         collections = data.get("collections", data.get("data", []))
      
@@ -66,17 +360,7 @@ class OpenSeaClient:
         limit: int = 50,
         chain: str | None = None,
     ) -> Dict[str, Any]:
-        # Supported order_by fields per docs:
-        # created_date, market_cap, num_owners, one_day_change, seven_day_change, seven_day_volume
-        allowed = {
-            "created_date",
-            "market_cap",
-            "num_owners",
-            "one_day_change",
-            "seven_day_change",
-            "seven_day_volume",
-        }
-        if order_by not in allowed:
+        if order_by not in COLLECTIONS_ORDER_BY:
             raise ValueError(f"Unsupported order_by: {order_by}")
 
         params: Dict[str, Any] = {
@@ -87,7 +371,96 @@ class OpenSeaClient:
         if chain:
             params["chain"] = chain
 
-        return await self._get("/collections", params)
+        return await self._collect_collections("collections", params, limit)
+
+    async def iter_collections(
+        self,
+        *,
+        order_by: str,
+        order_direction: str = "desc",
+        chain: str | None = None,
+        page_size: int = COLLECTIONS_PAGE_MAX,
+        max_pages: int | None = None,
+        prefetch: int = 1,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Yield collections one by one, following OpenSea's ``next`` cursor.
+
+        A background task fetches up to ``prefetch`` pages ahead of the consumer,
+        so memory stays bounded by ``(prefetch + 1) * page_size`` however far the
+        walk goes. Closing the generator cancels the pending fetch; consumers that
+        stop early should wrap it in ``contextlib.aclosing``. Pages are not cached;
+        each goes through the rate limiter.
+        """
+        if order_by not in COLLECTIONS_ORDER_BY:
+            raise ValueError(f"Unsupported order_by: {order_by}")
+        base: Dict[str, Any] = {
+            "order_by": order_by,
+            "order_direction": order_direction,
+            "limit": str(max(1, min(page_size, COLLECTIONS_PAGE_MAX))),
+        }
+        if chain:
+            base["chain"] = chain
+
+        pages: asyncio.Queue[Any] = asyncio.Queue(maxsize=max(1, prefetch))
+        done = object()
+
+        async def produce() -> None:
+            cursor: str | None = None
+            fetched = 0
+            try:
+                while max_pages is None or fetched < max_pages:
+                    params = dict(base, next=cursor) if cursor else base
+                    data = await self._get("/collections", params)
+                    fetched += 1
+                    await pages.put(data.get("collections", data.get("data", [])))
+                    cursor = data.get("next")
+                    if not cursor:
+                        break
+                await pages.put(done)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:  # noqa: BLE001
+                # Hand the error to the consumer at the point it was reached
+                await pages.put(e)
+
+        producer = asyncio.ensure_future(produce())
+        try:
+            while True:
+                page = await pages.get()
+                if page is done:
+                    return
+                if isinstance(page, Exception):
+                    raise page
+                for item in page:
+                    yield item
+        finally:
+            producer.cancel()
+
+    async def _collect_collections(self, endpoint: str, params: Dict[str, Any], limit: int) -> Dict[str, Any]:
+        """One cached page, or a cached multi-page walk when ``limit`` exceeds a page."""
+        if limit <= COLLECTIONS_PAGE_MAX:
+            return await self._cached_get(endpoint, "/collections", params)
+
+        async def load() -> Dict[str, Any]:
+            collections: List[Dict[str, Any]] = []
+            walk = self.iter_collections(
+                order_by=params["order_by"],
+                order_direction=params["order_direction"],
+                chain=params.get("chain"),
+            )
+            async with aclosing(walk):
+                async for item in walk:
+                    collections.append(item)
+                    if len(collections) >= limit:
+                        break
+            return {"collections": collections}
+
+        if self.cache is None:
+            return await load()
+        key = self.cache_key(endpoint, "/collections", params)
+        if _force_refresh.get():
+            return await self.cache.refresh(endpoint, key, load)
+        return await self.cache.get_or_load(endpoint, key, load)
 
     async def get_collection(self, slug: str) -> Dict[str, Any]:
         """Fetch details for a single collection by slug.
@@ -97,7 +470,7 @@ class OpenSeaClient:
         slug = slug.strip().split("/")[-1]
         if not slug:
             raise ValueError("Invalid collection slug")
-        return await self._get(f"/collections/{slug}")
+        return await self._cached_get("collection", f"/collections/{slug}")
 
     async def get_collection_stats(self, slug: str) -> Dict[str, Any]:
         """Fetch detailed statistics for a collection using the dedicated stats endpoint.
@@ -107,6 +480,8 @@ class OpenSeaClient:
         slug = slug.strip().split("/")[-1]
         if not slug:
             raise ValueError("Invalid collection slug")
-        return await self._get(f"/collections/{slug}/stats")
+        if not _force_refresh.get():
+            self.slug_demand[slug] += 1
+        return await self._cached_get("stats", f"/collections/{slug}/stats")
 
 
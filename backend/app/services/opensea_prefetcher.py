@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+from ..core.config import settings
+from .collection_contracts import collection_contracts
+from .opensea_client import OpenSeaClient, force_refresh
+
+logger = logging.getLogger("scooby.opensea_prefetcher")
+
+_Job = Tuple[str, str, Callable[[], Awaitable[Any]]]
+
+
+class OpenSeaPrefetcher:
+    """Background task that refreshes hot OpenSea datasets before they expire.
+
+    Each cycle refreshes the chat's default trending and volume lists, then the
+    stats of the most requested slugs, spending at most ``budget`` upstream
+    calls. Contracts found in the refreshed lists seed the slug -> contract
+    index. A job is only refreshed when its entry would expire before the cycle
+    after next, so long-lived entries are not reloaded every cycle. Cycles are
+    spaced by ``interval`` with +/- ``jitter`` (fraction) to avoid lockstep
+    bursts across workers.
+    """
+
+    def __init__(
+        self,
+        client: OpenSeaClient,
+        interval: float | None = None,
+        jitter: float | None = None,
+        budget: int | None = None,
+        top_slugs: int | None = None,
+    ) -> None:
+        self.client = client
+        self.interval = interval or settings.OPENSEA_PREFETCH_INTERVAL
+        self.jitter = settings.OPENSEA_PREFETCH_JITTER if jitter is None else jitter
+        self.budget = budget or settings.OPENSEA_PREFETCH_BUDGET
+        self.top_slugs = settings.OPENSEA_PREFETCH_TOP_SLUGS if top_slugs is None else top_slugs
+        self._task: asyncio.Task[None] | None = None
+        self._refreshed_at: Dict[str, float] = {}
+        self.counters: Dict[str, int] = {"cycles": 0, "refreshed": 0, "skipped": 0, "errors": 0, "over_budget": 0}
+        self._last_cycle_ms = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        if self.client.cache is None:
+            logger.info("[Prefetcher] OpenSea cache disabled; not starting")
+            return
+        self._task = asyncio.create_task(self._run())
+        logger.info("[Prefetcher] Started (interval=%.0fs, budget=%d, top_slugs=%d)", self.interval, self.budget, self.top_slugs)
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.refresh_once()
+            except Exception as e:  # noqa: BLE001
+                logger.warning("[Prefetcher] Cycle failed: %s", e)
+            await asyncio.sleep(self.interval * random.uniform(1 - self.jitter, 1 + self.jitter))
+
+    def _jobs(self) -> List[_Job]:
+        client = self.client
+        jobs: List[_Job] = [
+            ("trending", "trending", lambda: client.get_trending_collections(limit=settings.CHAT_TRENDING_LIMIT)),
+            (
+                "volume",
+                "volume",
+                lambda: client.get_collections_by_volume(days=settings.CHAT_VOLUME_DAYS, limit=settings.CHAT_VOLUME_LIMIT),
+            ),
+        ]
+        for slug in client.hot_slugs(self.top_slugs):
+            jobs.append((f"stats:{slug}", "stats", lambda slug=slug: client.get_collection_stats(slug)))
+        return jobs
+
+    def _due(self, name: str, endpoint: str, now: float) -> bool:
+        last = self._refreshed_at.get(name)
+        if last is None:
+            return True
+        assert self.client.cache is not None
+        ttl = self.client.cache.ttls.get(endpoint, 60.0)
+        # Must still be fresh when the cycle after next starts
+        horizon = 2 * self.interval * (1 + self.jitter)
+        return now - last + horizon >= ttl
+
+    async def refresh_once(self) -> int:
+        """Run one refresh cycle; returns the number of upstream calls made."""
+        started = time.perf_counter()
+        jobs = self._jobs()
+        calls = 0
+        with force_refresh():
+            for name, endpoint, call in jobs:
+                if not self._due(name, endpoint, time.monotonic()):
+                    self.counters["skipped"] += 1
+                    continue
+                if calls >= self.budget:
+                    self.counters["over_budget"] += 1
+                    continue
+                calls += 1
+                try:
+                    result = await call()
+                    self._refreshed_at[name] = time.monotonic()
+                    self.counters["refreshed"] += 1
+                    if endpoint in ("trending", "volume"):
+                        await collection_contracts.seed(result)
+                except Exception as e:  # noqa: BLE001
+                    self.counters["errors"] += 1
+                    logger.warning("[Prefetcher] Refresh of %s failed: %s", name, e)
+                    if name.startswith("stats:"):
+                        # Stop ranking a slug OpenSea keeps rejecting
+                        self.client.slug_demand.pop(name.split(":", 1)[1], None)
+        # Forget slugs that fell out of the hot set, then age the demand counts
+        active = {name for name, _, _ in jobs}
+        self._refreshed_at = {k: v for k, v in self._refreshed_at.items() if k in active}
+        self.client.decay_slug_demand()
+        self.counters["cycles"] += 1
+        self._last_cycle_ms = (time.perf_counter() - started) * 1000
+        return calls
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.counters,
+            "running": self.running,
+            "tracked_slugs": len(self.client.slug_demand),
+            "last_cycle_ms": round(self._last_cycle_ms, 2),
+        }
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import logging
+from typing import Any, Dict, Iterable, List, Mapping, Sequence
+
+logger = logging.getLogger("scooby.projection")
+
+
+# Columns the responder prompts actually use, in table order
+COLLECTION_COLUMNS: tuple[str, ...] = ("name", "slug", "floor", "volume", "change", "owners")
+STATS_COLUMNS: tuple[str, ...] = ("name", "slug", "floor", "volume", "owners", "market_cap", "sales")
+INTERVAL_COLUMNS: tuple[str, ...] = ("interval", "volume", "volume_change", "sales", "average_price")
+
+
+def _first(mapping: Mapping[str, Any], *keys: str) -> Any:
+    for key in keys:
+        value = mapping.get(key)
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def _one_day(stats: Mapping[str, Any]) -> Mapping[str, Any]:
+    intervals = stats.get("intervals") or []
+    for interval in intervals:
+        if isinstance(interval, dict) and interval.get("interval") == "one_day":
+            return interval
+    return {}
+
+
+def collection_rows(raw: Any) -> List[Dict[str, Any]]:
+    """Return the list of collection dicts from any OpenSea list payload shape."""
+    if isinstance(raw, list):
+        items: Iterable[Any] = raw
+    elif isinstance(raw, dict):
+        items = raw.get("collections") or raw.get("data") or []
+    else:
+        items = []
+    return [item for item in items if isinstance(item, dict)]
+
+
+def project_collection(item: Mapping[str, Any]) -> Dict[str, Any]:
+    """Reduce one OpenSea collection object to the compact columns.
+
+    The list endpoint omits stats, but some payloads embed them (``stats`` or
+    ``total``/``intervals``); whichever is present is used.
+    """
+    stats = item.get("stats") if isinstance(item.get("stats"), dict) else item
+    total = stats.get("total") if isinstance(stats.get("total"), dict) else stats
+    one_day = _one_day(stats)
+    return {
+        "name": _first(item, "name"),
+        "slug": _first(item, "collection", "slug"),
+        "floor": _first(total, "floor_price"),
+        "volume": _first(total, "seven_day_volume", "volume"),
+        "change": _first(one_day, "volume_change") if one_day else _first(total, "one_day_change", "seven_day_change"),
+        "owners": _first(total, "num_owners", "owner_count"),
+    }
+
+
+def project_collections(raw: Any, limit: int | None = None) -> List[Dict[str, Any]]:
+    rows = [project_collection(item) for item in collection_rows(raw)]
+    return rows[:limit] if limit is not None and limit >= 0 else rows
+
+
+def project_stats(slug: str, stats: Mapping[str, Any]) -> Dict[str, Any]:
+    """Reduce the all-time totals of a /collections/{slug}/stats payload to one compact row."""
+    total = stats.get("total") if isinstance(stats.get("total"), dict) else {}
+    return {
+        "name": _first(stats, "name"),
+        "slug": slug,
+        "floor": _first(total, "floor_price"),
+        "volume": _first(total, "volume"),
+        "owners": _first(total, "num_owners"),
+        "market_cap": _first(total, "market_cap"),
+        "sales": _first(total, "sales"),
+    }
+
+
+def project_stat_intervals(stats: Mapping[str, Any]) -> List[Dict[str, Any]]:
+    """One compact row per interval (one_day, seven_day, thirty_day) of a stats payload."""
+    return [
+        {
+            "interval": interval.get("interval"),
+            "volume": _first(interval, "volume"),
+            "volume_change": _first(interval, "volume_change"),
+            "sales": _first(interval, "sales"),
+            "average_price": _first(interval, "average_price"),
+        }
+        for interval in stats.get("intervals") or []
+        if isinstance(interval, dict) and interval.get("interval")
+    ]
+
+
+def _cell(value: Any) -> str:
+    if value is None:
+        return "-"
+    if isinstance(value, float):
+        return f"{value:,.0f}" if abs(value) >= 1000 else f"{value:.4g}"
+    return str(value).replace("|", "/").replace("\n", " ")
+
+
+def to_table(rows: Sequence[Mapping[str, Any]], columns: Sequence[str] = COLLECTION_COLUMNS) -> str:
+    """Render rows as a pipe-separated table, dropping columns that are empty in every row."""
+    used = [c for c in columns if any(row.get(c) is not None for row in rows)]
+    if not rows or not used:
+        return "(no data)"
+    lines = [" | ".join(used)]
+    lines.extend(" | ".join(_cell(row.get(c)) for c in used) for row in rows)
+    return "\n".join(lines)
+
+
+def estimate_tokens(chars: int) -> int:
+    """Rough token count (~4 characters per token for English/JSON text)."""
+    return (chars + 3) // 4
+
+
+def log_prompt_size(label: str, messages: Sequence[Mapping[str, Any]]) -> int:
+    """Log the approximate input size of a prompt and return the token estimate."""
+    chars = sum(len(str(m.get("content") or "")) for m in messages)
+    tokens = estimate_tokens(chars)
+    logger.info("[Prompt] %s: %d chars, ~%d tokens", label, chars, tokens)
+    return tokens
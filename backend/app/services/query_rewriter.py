@@ -3,9 +3,8 @@ from __future__ import annotations
 from typing import List
 import logging
 
-from openai import OpenAI
-
-from ..core.config import settings
+from .llm import get_openai_client
+from .llm_cache import prompt_version, rewrite_cache
 
 
 class QueryRewriter:
@@ -32,9 +31,14 @@ class QueryRewriter:
         "what's the current floor price of the collection? -> what's the current floor price of the collection Pudgy Penguins?"
     )
 
+    MODEL = "gpt-4o-mini"
+    # Cached rewrites are keyed on this, so editing the prompt invalidates them
+    PROMPT_VERSION = prompt_version(SYSTEM_PROMPT, MODEL, 0, 200)
+    # Trailing history pairs included in the prompt (and in the cache key)
+    HISTORY_PAIRS = 10
+
     def __init__(self, api_key: str | None = None) -> None:
-        key = api_key or getattr(settings, "OPENAI_API_KEY", None) or getattr(settings, "openai_api_key", None)
-        self.client = OpenAI(api_key=key) if key else None
+        self.client = get_openai_client(api_key)
         self.logger = logging.getLogger("scooby.query_rewriter")
 
     async def rewrite(self, user_question: str, history_pairs: List[str]) -> str:
@@ -43,7 +47,15 @@ class QueryRewriter:
             self.logger.info("[QueryRewriter] No OpenAI key; returning original question")
             return user_question.strip()
 
-        history_text = "\n\n".join(history_pairs[-10:])  # limit prompt size
+        # limit prompt size; the cache key covers the same turns the prompt does
+        prompt_history = history_pairs[-self.HISTORY_PAIRS:]
+        cache_key = rewrite_cache.key(self.PROMPT_VERSION, user_question, prompt_history)
+        cached = rewrite_cache.get(cache_key)
+        if cached is not None:
+            self.logger.info("[QueryRewriter] Cache hit: %r -> %r", user_question, cached)
+            return cached
+
+        history_text = "\n\n".join(prompt_history)
         prompt_user = (
             f"Conversation history (oldest -> newest):\n{history_text}\n\n"
             f"Rewrite the latest user query clearly and contextually.\n"
@@ -53,8 +65,8 @@ class QueryRewriter:
         self.logger.info("[QueryRewriter] Input: %r", user_question)
         self.logger.info("[QueryRewriter] History size: %d", len(history_pairs))
 
-        resp = self.client.chat.completions.create(
-            model="gpt-4o-mini",
+        resp = await self.client.chat.completions.create(
+            model=self.MODEL,
             messages=[
                 {"role": "system", "content": self.SYSTEM_PROMPT},
                 {"role": "user", "content": prompt_user},
@@ -64,6 +76,7 @@ class QueryRewriter:
         )
         rewritten = resp.choices[0].message.content.strip()
         self.logger.info("[QueryRewriter] Rewritten: %r", rewritten)
+        rewrite_cache.set(cache_key, rewritten)
         return rewritten
 
 
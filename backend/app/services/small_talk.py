@@ -2,9 +2,7 @@ from __future__ import annotations
 
 from typing import List
 
-from openai import OpenAI
-
-from ..core.config import settings
+from .llm import TokenCallback, complete_chat, get_openai_client
 
 
 NFT_KNOWLEDGE_BASE = (
@@ -43,10 +41,14 @@ class SmallTalkResponder:
     )
 
     def __init__(self, api_key: str | None = None) -> None:
-        key = api_key or getattr(settings, "OPENAI_API_KEY", None) or getattr(settings, "openai_api_key", None)
-        self.client = OpenAI(api_key=key) if key else None
+        self.client = get_openai_client(api_key)
 
-    async def respond(self, user_message: str, history_pairs: List[str] | None = None) -> str:
+    async def respond(
+        self,
+        user_message: str,
+        history_pairs: List[str] | None = None,
+        on_token: TokenCallback | None = None,
+    ) -> str:
 
         history_text = "\n\n".join((history_pairs or [])[-6:])
         user_prompt = (
@@ -55,7 +57,9 @@ class SmallTalkResponder:
             + "Respond now following the guidelines."
         )
 
-        resp = self.client.chat.completions.create(
+        reply = await complete_chat(
+            self.client,
+            on_token=on_token,
             model="gpt-4o-mini",
             messages=[
                 {"role": "system", "content": self.SYSTEM_PROMPT},
@@ -64,6 +68,6 @@ class SmallTalkResponder:
             temperature=0.6,
             max_tokens=160,
         )
-        return resp.choices[0].message.content.strip()
+        return reply.strip()
 
 
@@ -1,12 +1,17 @@
 from __future__ import annotations
 
-import json
 import logging
 from typing import Any, Dict
 
-from openai import OpenAI
-
-from ..core.config import settings
+from .llm import TokenCallback, complete_chat, get_openai_client
+from .payload_projection import (
+    INTERVAL_COLUMNS,
+    STATS_COLUMNS,
+    log_prompt_size,
+    project_stat_intervals,
+    project_stats,
+    to_table,
+)
 
 logger = logging.getLogger("scooby.stats_responder")
 
@@ -15,19 +20,22 @@ class StatsResponder:
     """Generate natural language responses from NFT collection statistics."""
     
     def __init__(self, api_key: str | None = None) -> None:
-        key = api_key or getattr(settings, "OPENAI_API_KEY", None) or getattr(settings, "openai_api_key", None)
-        if not key:
-            self.client = None
-        else:
-            self.client = OpenAI(api_key=key)
+        self.client = get_openai_client(api_key)
 
-    async def generate_response(self, user_question: str, collection_slug: str, stats_data: Dict[str, Any]) -> str:
+    async def generate_response(
+        self,
+        user_question: str,
+        collection_slug: str,
+        stats_data: Dict[str, Any],
+        on_token: TokenCallback | None = None,
+    ) -> str:
         """Generate a natural language response from stats data.
         
         Args:
             user_question: The original user question
             collection_slug: The collection slug being queried
             stats_data: The raw stats JSON from OpenSea API
+            on_token: Optional callback; when set the reply is streamed token by token
             
         Returns:
             Natural language response summarizing the stats
@@ -36,11 +44,6 @@ class StatsResponder:
             return self._fallback_response(collection_slug, stats_data)
         
         try:
-            # Extract key stats for the prompt
-            total_stats = stats_data.get("total", {})
-            intervals = stats_data.get("intervals", [])
-            one_day_stats = next((interval for interval in intervals if interval.get("interval") == "one_day"), {})
-            
             system_prompt = (
                 "You are an NFT statistics expert. Generate a concise, informative response about NFT collection statistics. "
                 "Be conversational and highlight the most relevant information based on the user's question. "
@@ -51,21 +54,26 @@ class StatsResponder:
             user_prompt = (
                 f"User asked: '{user_question}'\n"
                 f"Collection: {collection_slug}\n"
-                f"Statistics data: {json.dumps(stats_data, indent=2)}\n\n"
+                f"All-time totals:\n{to_table([project_stats(collection_slug, stats_data)], STATS_COLUMNS)}\n"
+                f"By interval:\n{to_table(project_stat_intervals(stats_data), INTERVAL_COLUMNS)}\n"
+                f"(volume_change is relative to the previous period of the same length, 0.12 = +12%)\n\n"
                 f"Generate a natural, conversational response that answers their question using this data."
             )
             
-            response = self.client.chat.completions.create(
+            messages = [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ]
+            log_prompt_size("stats", messages)
+            reply = await complete_chat(
+                self.client,
+                on_token=on_token,
                 model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
+                messages=messages,
                 temperature=0.7,
                 max_tokens=200
             )
             
-            reply = response.choices[0].message.content or ""
             logger.info("[StatsResponder] Generated response for %s: %s", collection_slug, reply[:100])
             return reply.strip()
             
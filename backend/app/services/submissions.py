@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from ..core.cache import TTLCache
+from ..core.config import settings
+from .llm_cache import normalize_query
+
+logger = logging.getLogger("scooby.submissions")
+
+
+def idempotency_key(
+    conversation_id: Optional[str],
+    wallet_address: Optional[str],
+    flow: str,
+    flow_id: Optional[str],
+    slots: Dict[str, Any],
+) -> str:
+    """Stable key for one flow submission: same flow run, wallet and slots -> same key.
+
+    ``flow_id`` changes every time the flow starts, so a deliberate second pool
+    or investment with the same answers gets a new key.
+    """
+    material = json.dumps(
+        {
+            "conversation_id": conversation_id,
+            "wallet": (wallet_address or "").lower(),
+            "flow": flow,
+            "flow_id": flow_id,
+            "slots": slots,
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()[:32]
+
+
+class SubmissionDeduplicator:
+    """Runs each pool create / invest submission once per idempotency key.
+
+    The first caller starts the submission as a task; concurrent duplicates
+    await the same task, and the completed result is replayed to retries for
+    ``retention`` seconds. The task is shielded, so a client that disconnects
+    does not abort work already sent to the frontend. Errors, and results that
+    ``keep`` rejects (e.g. the frontend refused the submission), are not stored,
+    so the next attempt runs again.
+
+    Once a submission succeeds the flow is finished, so a retry of that final
+    turn never reaches the submission code. ``replay`` covers that case by
+    matching the conversation, the run of the flow (``flow_id``) and the message
+    text of the submitting turn.
+    """
+
+    def __init__(self, retention: float | None = None, maxsize: int | None = None) -> None:
+        self.retention = settings.CHAT_SUBMISSION_RETENTION if retention is None else retention
+        maxsize = maxsize or settings.CHAT_SUBMISSION_STORE_SIZE
+        self._results: TTLCache[Any] = TTLCache(maxsize)
+        self._turns: TTLCache[str] = TTLCache(maxsize)
+        self._inflight: Dict[str, asyncio.Task[Any]] = {}
+        self.counters: Dict[str, int] = {"submitted": 0, "joined": 0, "replayed": 0, "errors": 0}
+
+    async def run(
+        self,
+        key: str,
+        conversation_id: Optional[str],
+        flow_id: Optional[str],
+        message: str,
+        submit: Callable[[], Awaitable[Any]],
+        keep: Callable[[Any], bool] = lambda _: True,
+    ) -> Any:
+        if conversation_id and flow_id:
+            self._turns.set((conversation_id, flow_id, normalize_query(message)), key, ttl=self.retention)
+        existing = await self._existing(key)
+        if existing is not None:
+            return existing
+        self.counters["submitted"] += 1
+        task = asyncio.ensure_future(submit())
+        self._inflight[key] = task
+        task.add_done_callback(lambda t: self._finish(key, t, keep))
+        return await asyncio.shield(task)
+
+    async def replay(self, conversation_id: Optional[str], flow_id: Optional[str], message: str) -> Any:
+        """Result of the submission this flow run made with this exact turn, or None."""
+        if not conversation_id or not flow_id:
+            return None
+        entry = self._turns.get((conversation_id, flow_id, normalize_query(message)))
+        if entry is None:
+            return None
+        return await self._existing(entry.value)
+
+    async def _existing(self, key: str) -> Any:
+        stored = self._results.get(key)
+        if stored is not None:
+            self.counters["replayed"] += 1
+            logger.info("[Submissions] Replaying result for %s", key)
+            return stored.value
+        task = self._inflight.get(key)
+        if task is not None:
+            self.counters["joined"] += 1
+            logger.info("[Submissions] Joining in-flight submission %s", key)
+            return await asyncio.shield(task)
+        return None
+
+    def _finish(self, key: str, task: asyncio.Task[Any], keep: Callable[[Any], bool]) -> None:
+        self._inflight.pop(key, None)
+        if task.cancelled():
+            return
+        exc = task.exception()
+        if exc is not None:
+            self.counters["errors"] += 1
+            logger.warning("[Submissions] Submission %s failed: %s", key, exc)
+            return
+        if keep(task.result()):
+            self._results.set(key, task.result(), ttl=self.retention)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.counters, "inflight": len(self._inflight), "stored": len(self._results)}
+
+
+submissions = SubmissionDeduplicator()
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Sequence
+
+from .payload_projection import project_collections
+
+
+RENDER_MODES = ("llm", "template")
+
+_ORDER_TITLES: Dict[str, str] = {
+    "market_cap": "Market Cap",
+    "num_owners": "Number of Owners",
+    "one_day_change": "24h Change",
+    "seven_day_change": "7-Day Change",
+    "seven_day_volume": "7-Day Volume",
+    "created_date": "Newest",
+}
+
+
+def _num(value: Any) -> str:
+    try:
+        n = float(value)
+    except (TypeError, ValueError):
+        return str(value)
+    if abs(n) >= 1_000_000:
+        return f"{n / 1_000_000:.1f}M"
+    if abs(n) >= 1_000:
+        return f"{n / 1_000:.1f}K"
+    if abs(n) < 1:
+        # Significant digits, so a 0.004 ETH floor does not round to 0
+        return f"{n:.4g}"
+    return f"{n:,.2f}".rstrip("0").rstrip(".")
+
+
+def _pct(value: Any) -> str:
+    try:
+        n = float(value)
+    except (TypeError, ValueError):
+        return str(value)
+    # OpenSea reports changes as fractions (0.12 == +12%)
+    return f"{n * 100:+.1f}%"
+
+
+def _details(row: Dict[str, Any]) -> str:
+    parts: List[str] = []
+    if row.get("floor") is not None:
+        parts.append(f"💰 **Floor:** {_num(row['floor'])} ETH")
+    if row.get("volume") is not None:
+        parts.append(f"📊 **Volume:** {_num(row['volume'])} ETH")
+    if row.get("change") is not None:
+        parts.append(f"📈 **Change:** {_pct(row['change'])}")
+    if row.get("owners") is not None:
+        parts.append(f"👥 **{_num(row['owners'])} owners**")
+    return " • ".join(parts)
+
+
+def _name(row: Dict[str, Any]) -> str:
+    return row.get("name") or row.get("slug") or "Unnamed Collection"
+
+
+def _rank_emoji(i: int, emojis: Sequence[str]) -> str:
+    return emojis[i - 1] if i <= len(emojis) else emojis[-1]
+
+
+def _render_list(
+    title: str,
+    rows: List[Dict[str, Any]],
+    emojis: Sequence[str],
+    cta: str,
+    subtitle: str | None = None,
+    links: bool = False,
+) -> str:
+    if not rows:
+        return f"{title}\n\n🔍 No collections found right now. Try again in a moment!"
+    lines = [title, f"*{subtitle}*\n" if subtitle else ""]
+    for i, row in enumerate(rows, 1):
+        name = _name(row)
+        if links and row.get("slug"):
+            name = f"[{name}](https://opensea.io/collection/{row['slug']})"
+        lines.append(f"{i}. **{name}** {_rank_emoji(i, emojis)}")
+        details = _details(row)
+        if details:
+            lines.append(f"   {details}")
+    lines.extend(["", cta])
+    return "\n".join(lines)
+
+
+def render_trending(raw: Any, limit: int) -> str:
+    rows = project_collections(raw, limit)
+    return _render_list(
+        f"## 🔥 Top {len(rows)} Trending Collections 📈",
+        rows,
+        ("💥", "🔥", "📈"),
+        "🎯 **Catch the momentum!** Create a pool for a trending collection and invest together.",
+        subtitle="Ranked by 24h change",
+    )
+
+
+def render_volume(raw: Any, limit: int | None = None) -> str:
+    rows = project_collections(raw, limit)
+    return _render_list(
+        "## 📊 Top Collections by Volume 💎",
+        rows,
+        ("🚀", "💎", "⭐"),
+        "🏊‍♂️ **Want in?** Create a pool for one of these collections and start investing!",
+        subtitle="Sorted by volume in descending order",
+    )
+
+
+def render_collections(raw: Any, order_by: str, limit: int) -> str:
+    rows = project_collections(raw, limit)
+    label = _ORDER_TITLES.get(order_by, order_by.replace("_", " ").title())
+    return _render_list(
+        f"## 💎 Top Collections by {label} 🚀",
+        rows,
+        ("🚀", "💎", "⭐"),
+        "✨ **Explore these collections** on OpenSea, or create a pool to invest together!",
+        links=True,
+    )
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import logging
+import uuid
+from typing import Any, Dict, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.cache import TTLCache
+from ..core.config import settings
+from ..models.models import User
+
+logger = logging.getLogger("scooby.wallet_users")
+
+
+def normalize_wallet(wallet_address: str) -> str:
+    return wallet_address.strip().lower()
+
+
+class WalletUserResolver:
+    """Map wallet addresses to user ids with an in-process LRU in front of the users table.
+
+    Lookups match on lower(wallet_address) so they use ux_users_wallet. Creation
+    is one ``INSERT ... ON CONFLICT ... RETURNING`` against that index, so two
+    concurrent first requests for a wallet end up with the same user_id.
+    Only hits are cached; a wallet without a user is looked up again next time.
+    """
+
+    def __init__(self, maxsize: int | None = None, ttl: float | None = None) -> None:
+        self._cache: TTLCache[str] = TTLCache(maxsize or settings.WALLET_CACHE_SIZE)
+        self.ttl = settings.WALLET_CACHE_TTL if ttl is None else ttl
+        self.counters: Dict[str, int] = {"hits": 0, "lookups": 0, "upserts": 0}
+
+    def _cached(self, wallet: str) -> Optional[str]:
+        entry = self._cache.get(wallet)
+        if entry is not None:
+            self.counters["hits"] += 1
+            return entry.value
+        return None
+
+    async def resolve(self, db: AsyncSession, wallet_address: str) -> Optional[str]:
+        """Return the user_id for a wallet, or None if it has none. Never writes."""
+        wallet = normalize_wallet(wallet_address)
+        cached = self._cached(wallet)
+        if cached is not None:
+            return cached
+        self.counters["lookups"] += 1
+        user_id = (
+            await db.execute(select(User.user_id).where(func.lower(User.wallet_address) == wallet))
+        ).scalar_one_or_none()
+        if user_id is not None:
+            self._cache.set(wallet, str(user_id), ttl=self.ttl)
+            return str(user_id)
+        return None
+
+    async def get_or_create(self, db: AsyncSession, wallet_address: str) -> str:
+        """Return the user_id for a wallet, creating a minimal user on first sight.
+
+        This avoids requiring email/password for wallet-auth users.
+        """
+        wallet = normalize_wallet(wallet_address)
+        cached = self._cached(wallet)
+        if cached is not None:
+            return cached
+        self.counters["upserts"] += 1
+        stmt = insert(User).values(user_id=str(uuid.uuid4()), wallet_address=wallet)
+        # The no-op update makes RETURNING yield the existing row on conflict
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[func.lower(User.wallet_address)],
+            set_={"wallet_address": stmt.excluded.wallet_address},
+        ).returning(User.user_id)
+        user_id = str((await db.execute(stmt)).scalar_one())
+        await db.commit()
+        self._cache.set(wallet, user_id, ttl=self.ttl)
+        return user_id
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.counters, **self._cache.stats()}
+
+
+wallet_users = WalletUserResolver()
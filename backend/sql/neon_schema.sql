@@ -19,11 +19,53 @@ CREATE TABLE IF NOT EXISTS public.conversation_messages (
   rewritten_question text NULL,
   intent            text NULL,
   ai_answer         text NULL,
+  data              jsonb NULL,
   created_at        timestamptz NOT NULL DEFAULT now()
 );
 
+-- Structured reply payload (added after the initial schema)
+ALTER TABLE public.conversation_messages ADD COLUMN IF NOT EXISTS data jsonb NULL;
+
 -- Helpful indexes for fetching history
 CREATE INDEX IF NOT EXISTS ix_conv_user_id ON public.conversation_messages (user_id);
 CREATE INDEX IF NOT EXISTS ix_conv_conversation_id ON public.conversation_messages (conversation_id);
 CREATE INDEX IF NOT EXISTS ix_conv_user_conv_created ON public.conversation_messages (user_id, conversation_id, created_at);
+-- Latest-N-turns lookups for a conversation regardless of user
+CREATE INDEX IF NOT EXISTS ix_conv_conv_created ON public.conversation_messages (conversation_id, created_at, message_id);
+
+-- Structured flow state per conversation (active flow + collected slots)
+CREATE TABLE IF NOT EXISTS public.conversation_state (
+  conversation_id text PRIMARY KEY,
+  user_id         text NULL REFERENCES public.users(user_id) ON DELETE SET NULL,
+  flow            text NULL,
+  awaiting        text NULL,
+  slots           jsonb NOT NULL DEFAULT '{}'::jsonb,
+  updated_at      timestamptz NOT NULL DEFAULT now()
+);
+
+-- Identifies one run of a flow, for idempotent pool create / invest submissions
+ALTER TABLE public.conversation_state ADD COLUMN IF NOT EXISTS flow_id text NULL;
 
+-- Per-conversation summary for the sidebar listing and last-intent lookups.
+-- Upserted with every batch of persisted messages; backfill existing data with
+--   python -m app.cli.backfill_conversations
+CREATE TABLE IF NOT EXISTS public.conversations (
+  conversation_id text PRIMARY KEY,
+  user_id         text NULL REFERENCES public.users(user_id) ON DELETE SET NULL,
+  last_message_at timestamptz NOT NULL,
+  last_message_id bigint NOT NULL,
+  preview         text NOT NULL DEFAULT '',
+  message_count   bigint NOT NULL DEFAULT 0,
+  last_intent     text NULL
+);
+CREATE INDEX IF NOT EXISTS ix_conversations_user_last ON public.conversations (user_id, last_message_at, last_message_id);
+
+-- OpenSea collection slug -> NFT contract address and chain. Filled the first
+-- time a slug is resolved and seeded from prefetched collection lists.
+CREATE TABLE IF NOT EXISTS public.collection_contracts (
+  slug       text PRIMARY KEY,
+  address    text NOT NULL,
+  chain      text NOT NULL,
+  chain_id   bigint NOT NULL,
+  updated_at timestamptz NOT NULL DEFAULT now()
+);
@@ -0,0 +1,62 @@
+import asyncio
+from types import SimpleNamespace
+
+from app.services.llm import complete_chat
+
+
+def _chunk(text):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+
+class _SlowStream:
+    """Yields the first delta at once, then takes ``tail`` seconds for the rest."""
+
+    def __init__(self, parts, tail):
+        self.parts = list(parts)
+        self.tail = tail
+        self.closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self.parts:
+            raise StopAsyncIteration
+        if len(self.parts) == 1:
+            await asyncio.sleep(self.tail)
+        return _chunk(self.parts.pop(0))
+
+    async def close(self):
+        self.closed = True
+
+
+class _FakeClient:
+    def __init__(self, stream):
+        self.stream = stream
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    async def _create(self, stream=False, **kwargs):
+        assert stream, "bounded completions must be streamed"
+        return self.stream
+
+
+def test_long_reply_that_starts_quickly_is_not_cut_off():
+    stream = _SlowStream(["Top ", "collections"], tail=0.3)
+    reply = asyncio.run(complete_chat(_FakeClient(stream), timeout=0.1, model="m", messages=[]))
+    assert reply == "Top collections"
+    assert not stream.closed
+
+
+def test_no_output_within_timeout_raises():
+    class _Silent(_SlowStream):
+        async def __anext__(self):
+            await asyncio.sleep(1)
+
+    stream = _Silent([], tail=0)
+    try:
+        asyncio.run(complete_chat(_FakeClient(stream), timeout=0.05, model="m", messages=[]))
+    except asyncio.TimeoutError:
+        pass
+    else:
+        raise AssertionError("expected a timeout")
+    assert stream.closed
@@ -0,0 +1,39 @@
+from app.services.payload_projection import (
+    INTERVAL_COLUMNS,
+    project_stat_intervals,
+    project_stats,
+    to_table,
+)
+
+STATS = {
+    "total": {"volume": 250000.5, "sales": 41000, "num_owners": 9800, "floor_price": 10.2, "market_cap": 90000.0},
+    "intervals": [
+        {"interval": "one_day", "volume": 120.5, "volume_change": 0.12, "sales": 11, "average_price": 10.95},
+        {"interval": "seven_day", "volume": 1520.25, "volume_change": -0.3, "sales": 140, "average_price": 10.86},
+        {"interval": "thirty_day", "volume": 6400.0, "volume_change": 0.05, "sales": 600, "average_price": 10.67},
+    ],
+}
+
+
+def test_seven_day_figures_survive_projection():
+    rows = {row["interval"]: row for row in project_stat_intervals(STATS)}
+    assert set(rows) == {"one_day", "seven_day", "thirty_day"}
+    assert rows["seven_day"] == {
+        "interval": "seven_day",
+        "volume": 1520.25,
+        "volume_change": -0.3,
+        "sales": 140,
+        "average_price": 10.86,
+    }
+    table = to_table(project_stat_intervals(STATS), INTERVAL_COLUMNS)
+    assert "seven_day | 1,520 | -0.3 | 140 | 10.86" in table
+
+
+def test_totals_carry_no_unlabelled_change():
+    row = project_stats("pudgypenguins", STATS)
+    assert row["volume"] == 250000.5
+    assert "change" not in row
+
+
+def test_missing_intervals_project_to_nothing():
+    assert project_stat_intervals({"total": {}}) == []
@@ -0,0 +1,18 @@
+from app.services.template_renderer import _num, render_volume
+
+
+def test_num_keeps_sub_cent_values():
+    assert _num(0.004) == "0.004"
+    assert _num(0.01234) == "0.01234"
+    assert _num(0) == "0"
+
+
+def test_num_formats_larger_values():
+    assert _num(12.5) == "12.5"
+    assert _num(2500) == "2.5K"
+    assert _num(3_200_000) == "3.2M"
+
+
+def test_render_volume_shows_sub_cent_floor():
+    raw = {"collections": [{"name": "Tiny", "collection": "tiny", "stats": {"total": {"floor_price": 0.004}}}]}
+    assert "💰 **Floor:** 0.004 ETH" in render_volume(raw)
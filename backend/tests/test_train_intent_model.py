@@ -0,0 +1,21 @@
+from app.cli.train_intent_model import usable_samples
+
+
+def test_flow_turns_are_left_out():
+    rows = [
+        ("show me pools for pudgy penguins", "retrieve_pools"),
+        # Flow turns are stored without a rewrite, whatever their text
+        (None, "retrieve_pools"),
+        (None, "nft_statistics"),
+        (None, "create_pool"),
+    ]
+    assert usable_samples(rows) == [("show me pools for pudgy penguins", "retrieve_pools")]
+
+
+def test_bare_answers_and_unknown_intents_are_left_out():
+    rows = [
+        ("0.5", "pool_invest"),
+        ("what is trending on opensea", "not_an_intent"),
+        ("  what is trending on opensea  ", "opensea_trending"),
+    ]
+    assert usable_samples(rows) == [("what is trending on opensea", "opensea_trending")]
@@ -40,6 +40,8 @@ export default function ChatPage() {
   const [userId, setUserId] = useState<string | null>(null);
   const { user } = useConditionalWallet();
   const [isLoading, setIsLoading] = useState(false);
+  // Cursor of the oldest loaded turn while the backend has older ones
+  const [olderCursor, setOlderCursor] = useState<string | null>(null);
 
   const API_BASE = process.env.NEXT_PUBLIC_API_BASE || "http://localhost:8000";
 
@@ -93,47 +95,37 @@ export default function ChatPage() {
     } catch {}
   }, []);
 
+  // One page of history: the latest turns, or those before `before`
+  async function fetchHistoryPage(conversationId: string, before?: string) {
+    const walletAddress = user?.walletAddress || undefined;
+    const params = new URLSearchParams({ conversation_id: conversationId });
+    if (userId) params.set("user_id", userId);
+    if (walletAddress) params.set("wallet_address", walletAddress);
+    if (before) params.set("before", before);
+    const res = await fetch(`${API_BASE}/chat/messages?${params.toString()}`);
+    if (!res.ok) return null;
+    const data = (await res.json()) as typeof messages;
+    const cursor =
+      res.headers.get("X-Has-More") === "true"
+        ? res.headers.get("X-Before-Cursor")
+        : null;
+    return { data, cursor };
+  }
+
   // Load history when chatId changes
   useEffect(() => {
     setMessages([]);
     setMessage("");
+    setOlderCursor(null);
 
     async function loadHistory() {
       if (!chatId) return;
       setIsLoading(true);
       try {
-        const walletAddress = user?.walletAddress || undefined;
-        const params = new URLSearchParams({ conversation_id: chatId });
-        if (userId) params.set("user_id", userId);
-        if (walletAddress) params.set("wallet_address", walletAddress);
-        const res = await fetch(
-          `${API_BASE}/chat/messages?${params.toString()}`
-        );
-        if (res.ok) {
-          const data = (await res.json()) as Array<{
-            role: "user" | "assistant";
-            content: string;
-            data?: {
-              collections?: Array<{
-                name: string;
-                category: string;
-                chain: string;
-                opensea_url: string;
-              }>;
-              stats?: {
-                total?: {
-                  floor_price?: number;
-                  floor_price_symbol?: string;
-                  num_owners?: number;
-                  market_cap?: number;
-                  volume?: number;
-                };
-              };
-              slug?: string;
-              opensea_url?: string;
-            };
-          }>;
-          setMessages(data);
+        const page = await fetchHistoryPage(chatId);
+        if (page) {
+          setMessages(page.data);
+          setOlderCursor(page.cursor);
         }
       } finally {
         setIsLoading(false);
@@ -143,6 +135,15 @@ export default function ChatPage() {
     loadHistory();
   }, [chatId, user?.walletAddress, userId, API_BASE]);
 
+  async function loadOlderMessages() {
+    if (!chatId || !olderCursor) return;
+    const page = await fetchHistoryPage(chatId, olderCursor);
+    if (page) {
+      setMessages((prev) => [...page.data, ...prev]);
+      setOlderCursor(page.cursor);
+    }
+  }
+
   async function refreshConversations() {
     try {
       // Trigger sidebar reload by dispatching a custom event it listens to
@@ -370,6 +371,16 @@ export default function ChatPage() {
             </div>
             <div className="flex-1 overflow-y-auto p-6">
               <div className="max-w-3xl mx-auto space-y-4">
+                {olderCursor && (
+                  <div className="flex justify-center">
+                    <button
+                      onClick={loadOlderMessages}
+                      className="text-xs text-white/60 hover:text-white transition-colors"
+                    >
+                      Load older messages
+                    </button>
+                  </div>
+                )}
                 {messages.map((m, idx) => (
                   <div
                     key={idx}
@@ -27,13 +27,14 @@ export default function ChatSidebar() {
   const { hasPools, poolCount } = useMyPools();
 
   const [chats, setChats] = useState<Chat[]>([]);
+  // Cursor of the oldest listed conversation while the backend has older ones
+  const [olderCursor, setOlderCursor] = useState<string | null>(null);
   const API_BASE = process.env.NEXT_PUBLIC_API_BASE || "http://localhost:8000";
 
   // Fetch conversation summaries
   useEffect(() => {
     async function load() {
       try {
-        const uid = user?.id;
         const wallet = user?.walletAddress;
 
         // Ensure backend user exists for this wallet (idempotent)
@@ -47,35 +48,10 @@ export default function ChatSidebar() {
           } catch {}
         }
 
-        // Prefer wallet-based conversations so backend can resolve/create user
-        let url = `${API_BASE}/chat/conversations`;
-        if (wallet) {
-          url = `${API_BASE}/chat/conversations?wallet_address=${encodeURIComponent(
-            wallet
-          )}`;
-        } else if (uid) {
-          url = `${API_BASE}/chat/conversations?user_id=${encodeURIComponent(
-            uid
-          )}`;
-        }
-        const res = await fetch(url);
-        if (!res.ok) return;
-        const data: Array<{
-          conversation_id: string;
-          last_message_at: string;
-          preview: string;
-        }> = await res.json();
-        const mapped: Chat[] = data.map((d) => ({
-          id: d.conversation_id,
-          title: d.preview?.trim()
-            ? d.preview
-            : `Chat ${d.conversation_id.slice(0, 4)}`,
-          preview: d.preview || "",
-          timestamp: d.last_message_at
-            ? new Date(d.last_message_at).toLocaleString()
-            : "",
-        }));
-        setChats(mapped);
+        const page = await fetchConversationsPage();
+        if (!page) return;
+        setChats(page.chats);
+        setOlderCursor(page.cursor);
       } catch {}
     }
     load();
@@ -87,6 +63,55 @@ export default function ChatSidebar() {
       window.removeEventListener("chat:refresh-conversations", listener);
   }, [user?.id, user?.walletAddress, API_BASE]);
 
+  // One page of conversations: the most recent, or those before `before`
+  async function fetchConversationsPage(before?: string) {
+    const uid = user?.id;
+    const wallet = user?.walletAddress;
+    // Prefer wallet-based conversations so backend can resolve/create user
+    const params = new URLSearchParams();
+    if (wallet) {
+      params.set("wallet_address", wallet);
+    } else if (uid) {
+      params.set("user_id", uid);
+    }
+    if (before) params.set("before", before);
+    const query = params.toString();
+    const res = await fetch(
+      `${API_BASE}/chat/conversations${query ? `?${query}` : ""}`
+    );
+    if (!res.ok) return null;
+    const data: Array<{
+      conversation_id: string;
+      last_message_at: string;
+      preview: string;
+    }> = await res.json();
+    const mapped: Chat[] = data.map((d) => ({
+      id: d.conversation_id,
+      title: d.preview?.trim()
+        ? d.preview
+        : `Chat ${d.conversation_id.slice(0, 4)}`,
+      preview: d.preview || "",
+      timestamp: d.last_message_at
+        ? new Date(d.last_message_at).toLocaleString()
+        : "",
+    }));
+    const cursor =
+      res.headers.get("X-Has-More") === "true"
+        ? res.headers.get("X-Before-Cursor")
+        : null;
+    return { chats: mapped, cursor };
+  }
+
+  async function loadOlderChats() {
+    if (!olderCursor) return;
+    try {
+      const page = await fetchConversationsPage(olderCursor);
+      if (!page) return;
+      setChats((prev) => [...prev, ...page.chats]);
+      setOlderCursor(page.cursor);
+    } catch {}
+  }
+
   const filteredChats = chats.filter((chat) =>
     chat.title.toLowerCase().includes(searchQuery.toLowerCase())
   );
@@ -309,6 +334,14 @@ export default function ChatSidebar() {
                 </div>
               </Link>
             ))}
+            {olderCursor && (
+              <button
+                onClick={loadOlderChats}
+                className="px-4 py-3 text-left text-sm text-white/60 hover:text-white transition-colors"
+              >
+                Load older chats
+              </button>
+            )}
             {filteredChats.length === 0 && searchQuery && (
               <div className="px-4 py-3 text-sm text-white/50">
                 No chats found